@@ -1,10 +1,13 @@
+import hmac
 from typing import AsyncGenerator
 
 from fastapi import Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.security import decode_token, TokenPayloadError
 from app.db.session import get_db_session
+from app.db.unit_of_work import UnitOfWork
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.services.errors import UserNotFound, InactiveUser
@@ -14,26 +17,28 @@ security = HTTPBearer()
 
 
 async def db_session_dep() -> AsyncGenerator[AsyncSession, None]:
+    # FastAPI caches this per request, so require_admin, the unit of work and
+    # the handler all share one session
     async for session in get_db_session():
         yield session
+
+
+async def unit_of_work_dep(
+    session: AsyncSession = Depends(db_session_dep),
+) -> AsyncGenerator[UnitOfWork, None]:
+    # declare with scope="function" so the commit lands before the response
+    async with UnitOfWork(session) as uow:
+        yield uow
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: AsyncSession = Depends(get_db_session),
 ):
+    # token-only: no session, so no pool connection is taken here
     token = credentials.credentials  # <-- raw JWT
 
     user_id = decode_token(token, expected_type="access")
 
-    # # repo = UserRepository(session)
-    # # user = await repo.get_by_id(user_id)
-
-    # if not user:
-    #     raise UserNotFound()
-
-    # if not user.is_active:
-    #     raise InactiveUser()
-
-    # return user
     return user_id
 
 async def require_admin(
@@ -41,7 +46,7 @@ async def require_admin(
     session: AsyncSession = Depends(db_session_dep),
 ):
     repo = UserRepository(session)
-    user = await repo.get_by_id(current_user_id)
+    user = await repo.get_snapshot(current_user_id)
 
     if not user or not user.is_active:
         raise InactiveUser()
@@ -49,4 +54,17 @@ async def require_admin(
     if not user.is_admin:
         raise PermissionError("Admin access required")
 
-    return user
\ No newline at end of file
+    return user
+
+
+async def require_service(x_service_key: str | None = Header(default=None)) -> None:
+    """Only internal services holding a configured key may call this route."""
+    keys = [
+        key.strip()
+        for key in get_settings().introspection_service_keys.split(",")
+        if key.strip()
+    ]
+    if not x_service_key or not any(
+        hmac.compare_digest(x_service_key.encode(), key.encode()) for key in keys
+    ):
+        raise PermissionError("Service credential required")
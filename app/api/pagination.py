@@ -0,0 +1,21 @@
+import base64
+import binascii
+
+from app.services.errors import InvalidCursor
+
+_PREFIX = "id:"
+
+
+def encode_cursor(last_id: str) -> str:
+    """Opaque cursor pointing just past last_id."""
+    return base64.urlsafe_b64encode(f"{_PREFIX}{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor()
+    if not raw.startswith(_PREFIX):
+        raise InvalidCursor()
+    return raw[len(_PREFIX) :]
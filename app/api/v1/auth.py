@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
-from app.api.deps import db_session_dep
-from app.schemas.auth import LoginRequest, TokenResponse,RefreshTokenRequest,LogoutRequest,ForgotPasswordRequest,ForgotPasswordResponse,ResetPasswordRequest
+from app.api.deps import require_service, unit_of_work_dep
+from app.db.unit_of_work import UnitOfWork
+from app.schemas.auth import LoginRequest, TokenResponse,RefreshTokenRequest,LogoutRequest,ForgotPasswordRequest,ForgotPasswordResponse,ResetPasswordRequest,IntrospectRequest,TokenIntrospection
 from app.schemas.common import ResponseSchema
 from app.services.auth_service import AuthService
 from app.services.errors import (
@@ -18,10 +18,15 @@ router = APIRouter(tags=["auth"])
 @router.post("/auth/login", response_model=ResponseSchema[TokenResponse])
 async def login(
     payload: LoginRequest,
-    session: AsyncSession = Depends(db_session_dep),
+    request: Request,
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = AuthService(session)
-    tokens = await service.login(payload.email, payload.password)
+    service = AuthService(uow.session)
+    tokens = await service.login(
+        payload.email,
+        payload.password,
+        client_ip=request.client.host if request.client else None,
+    )
 
     return ResponseSchema(
         success=True,
@@ -35,9 +40,9 @@ async def login(
 )
 async def refresh_token(
     payload: RefreshTokenRequest,
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = AuthService(session)
+    service = AuthService(uow.session)
     try:
         token_data = await service.refresh_access_token(payload.refresh_token)
         return ResponseSchema(
@@ -52,15 +57,33 @@ async def refresh_token(
             detail={"code": e.code, "message": e.message},
         )
 
+@router.post(
+    "/auth/introspect",
+    response_model=ResponseSchema[list[TokenIntrospection]],
+    dependencies=[Depends(require_service)],
+)
+async def introspect(
+    payload: IntrospectRequest,
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
+):
+    service = AuthService(uow.session)
+    results = await service.introspect(payload.tokens)
+
+    return ResponseSchema(
+        success=True,
+        data=[TokenIntrospection(**r) for r in results],
+        error=None,
+    )
+
 @router.post(
     "/auth/logout",
     response_model=ResponseSchema[None],
 )
 async def logout(
     payload: LogoutRequest,
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = AuthService(session)
+    service = AuthService(uow.session)
     try:
         await service.logout(payload.refresh_token)
         return ResponseSchema(
@@ -81,10 +104,14 @@ async def logout(
 )
 async def forgot_password(
     payload: ForgotPasswordRequest,
-    session: AsyncSession = Depends(db_session_dep),
+    request: Request,
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = AuthService(session)
-    token = await service.forgot_password(payload.email)
+    service = AuthService(uow.session)
+    token = await service.forgot_password(
+        payload.email,
+        client_ip=request.client.host if request.client else None,
+    )
 
     return ResponseSchema(
         success=True,
@@ -99,9 +126,9 @@ async def forgot_password(
 )
 async def reset_password(
     payload: ResetPasswordRequest,
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = AuthService(session)
+    service = AuthService(uow.session)
     try:
         await service.reset_password(
             payload.reset_token,
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Request, Response, status
+
+from app.core.config import get_settings
+from app.core.security import get_jwks
+
+router = APIRouter(tags=["jwks"])
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    body, etag = get_jwks()
+    headers = {
+        "Cache-Control": f"public, max-age={get_settings().jwks_max_age_seconds}",
+        "ETag": etag,
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_admin
+from app.core.invalidation import invalidation_bus
+from app.core.rate_limit import rate_limit_stats
+from app.core.security import hash_executor_stats, token_cache_stats
+from app.core.singleflight import singleflight_stats
+from app.db.partitions import partition_maintainer
+from app.db.session import pool_stats
+from app.repositories.refresh_token_cache import refresh_token_cache_stats
+from app.repositories.user_cache import user_cache_stats
+from app.schemas.common import ResponseSchema
+from app.services.auth_service import introspection_cache_stats
+from app.services.availability import availability_index
+from app.services.token_purge import token_purger
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/admin/metrics",
+    response_model=ResponseSchema[dict],
+)
+async def get_metrics(
+    admin_user=Depends(require_admin),
+):
+    return ResponseSchema(
+        success=True,
+        data={
+            "password_hashing": hash_executor_stats(),
+            "db_pool": pool_stats(),
+            "rate_limit": rate_limit_stats(),
+            "token_cache": token_cache_stats(),
+            "introspection_cache": introspection_cache_stats(),
+            "user_cache": user_cache_stats(),
+            "refresh_token_cache": refresh_token_cache_stats(),
+            "invalidation": invalidation_bus.stats(),
+            "singleflight": singleflight_stats(),
+            "availability": availability_index.stats(),
+            "token_purge": token_purger.stats(),
+            "partitions": partition_maintainer.stats(),
+        },
+        error=None,
+    )
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 
-from app.api.deps import db_session_dep
-from app.schemas.user import UserCreate, UserRead,UserUpdate, ChangePasswordRequest
-from app.schemas.common import ResponseSchema
+from fastapi import APIRouter, Depends, Query, status
+
+from app.api.deps import unit_of_work_dep
+from app.api.pagination import decode_cursor, encode_cursor
+from app.db.unit_of_work import UnitOfWork
+from app.schemas.user import UserCreate, UserRead,UserUpdate, ChangePasswordRequest, AvailabilityRead
+from app.schemas.common import PagedResponseSchema, ResponseSchema
 from app.services.user_service import UserService
 from app.api.deps import get_current_user, require_admin
 from app.models.user import User
-from app.repositories.user_repository import UserRepository
+from app.repositories.user_repository import UserFilters, UserRepository
 from app.services.errors import UserNotFound
 
 router = APIRouter(tags=["users"])
@@ -20,9 +23,9 @@ router = APIRouter(tags=["users"])
 )
 async def register_user(
     payload: UserCreate,
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = UserService(session)
+    service = UserService(uow.session)
     user = await service.register_user(
         email=payload.email,
         username=payload.username,
@@ -35,15 +38,33 @@ async def register_user(
         error=None,
     )
 
+@router.get(
+    "/users/availability",
+    response_model=ResponseSchema[AvailabilityRead],
+)
+async def check_availability(
+    email: str | None = Query(default=None, max_length=255),
+    username: str | None = Query(default=None, max_length=50),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
+):
+    service = UserService(uow.session)
+    availability = await service.check_availability(email=email, username=username)
+
+    return ResponseSchema(
+        success=True,
+        data=AvailabilityRead(**availability),
+        error=None,
+    )
+
 @router.get(
     "/users/me",
     response_model=ResponseSchema[UserRead],
 )
 async def get_me(
     current_user_id: str = Depends(get_current_user),
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = UserService(session)
+    service = UserService(uow.session)
     user = await service.get_user(current_user_id)
 
     return ResponseSchema(
@@ -60,9 +81,9 @@ async def get_me(
 async def update_me(
     payload: UserUpdate,
     current_user: str = Depends(get_current_user),
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = UserService(session)
+    service = UserService(uow.session)
     user = await service.update_profile(
         user_id=current_user,
         username=payload.username,
@@ -81,9 +102,9 @@ async def update_me(
 async def change_password(
     payload: ChangePasswordRequest,
     current_user: str = Depends(get_current_user),
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    service = UserService(session)
+    service = UserService(uow.session)
     await service.change_password(
         user_id=current_user,
         current_password=payload.current_password,
@@ -98,21 +119,43 @@ async def change_password(
 
 @router.get(
     "/admin/users",
-    response_model=ResponseSchema[list[UserRead]],
+    response_model=PagedResponseSchema[list[UserRead]],
 )
 async def list_users(
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0, description="deprecated, use cursor"),
+    cursor: str | None = None,
+    # fragments shorter than a trigram cannot use the search indexes
+    email: str | None = Query(default=None, min_length=3, max_length=255),
+    username: str | None = Query(default=None, min_length=3, max_length=50),
+    is_active: bool | None = None,
+    is_admin: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
     admin_user=Depends(require_admin),
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    repo = UserRepository(session)
-    users = await repo.list_users(limit=limit, offset=offset)
+    repo = UserRepository(uow.session)
+    after = decode_cursor(cursor) if cursor else None
+    filters = UserFilters(
+        email=email,
+        username=username,
+        is_active=is_active,
+        is_admin=is_admin,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    # one extra row tells us whether another page exists
+    users = await repo.list_users(
+        limit=limit + 1, offset=offset, after=after, filters=filters
+    )
+    next_cursor = encode_cursor(users[limit - 1].id) if len(users) > limit else None
 
-    return ResponseSchema(
+    return PagedResponseSchema(
         success=True,
-        data=[UserRead.model_validate(u) for u in users],
+        data=[UserRead.model_validate(u) for u in users[:limit]],
         error=None,
+        next_cursor=next_cursor,
     )
 
 @router.patch(
@@ -122,9 +165,9 @@ async def list_users(
 async def deactivate_user(
     user_id: str,
     admin_user=Depends(require_admin),
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    repo = UserRepository(session)
+    repo = UserRepository(uow.session)
     user = await repo.get_by_id(user_id)
     if not user:
         raise UserNotFound()
@@ -141,9 +184,9 @@ async def deactivate_user(
 async def deactivate_user(
     user_id: str,
     admin_user=Depends(require_admin),
-    session: AsyncSession = Depends(db_session_dep),
+    uow: UnitOfWork = Depends(unit_of_work_dep, scope="function"),
 ):
-    repo = UserRepository(session)
+    repo = UserRepository(uow.session)
     user = await repo.get_by_id(user_id)
     if not user:
         raise UserNotFound()
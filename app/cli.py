@@ -0,0 +1,86 @@
+"""Maintenance commands, e.g. ``python -m app.cli purge-tokens``."""
+
+import argparse
+import asyncio
+import json
+from dataclasses import asdict
+
+from app.core.config import get_settings
+from app.core.logging import setup_logging
+from app.core.security import calibrate_argon2
+from app.db.partitions import partition_maintainer
+from app.db.session import engine
+from app.services.token_purge import TokenPurger
+
+
+async def purge_tokens(args: argparse.Namespace) -> None:
+    purger = TokenPurger(
+        batch_size=args.batch_size,
+        pause_seconds=args.pause_seconds,
+        grace_seconds=args.grace_seconds,
+    )
+    try:
+        results = await purger.run()
+    finally:
+        await engine.dispose()
+    print(json.dumps([asdict(r) for r in results], indent=2))
+
+
+async def maintain_partitions(args: argparse.Namespace) -> None:
+    try:
+        result = await partition_maintainer.run(engine)
+    finally:
+        await engine.dispose()
+    print(json.dumps(result, indent=2))
+
+
+async def calibrate(args: argparse.Namespace) -> None:
+    params = calibrate_argon2(args.target_ms, args.memory_cost, args.parallelism)
+    # paste into the environment of every worker on this class of host
+    for name, value in sorted(params.items()):
+        print(f"ARGON2_{name.upper()}={value}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    setup_logging(settings.debug)
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    purge = commands.add_parser(
+        "purge-tokens",
+        help="delete expired, revoked and used refresh/password reset tokens",
+    )
+    purge.add_argument("--batch-size", type=int, default=settings.token_purge_batch_size)
+    purge.add_argument(
+        "--pause-seconds", type=float, default=settings.token_purge_pause_seconds
+    )
+    purge.add_argument(
+        "--grace-seconds", type=float, default=settings.token_purge_grace_seconds
+    )
+    purge.set_defaults(handler=purge_tokens)
+
+    partitions = commands.add_parser(
+        "maintain-partitions",
+        help="create upcoming refresh_tokens partitions and drop expired ones",
+    )
+    partitions.set_defaults(handler=maintain_partitions)
+
+    argon2 = commands.add_parser(
+        "calibrate-argon2",
+        help="benchmark this host and print argon2 settings for a target verify time",
+    )
+    argon2.add_argument(
+        "--target-ms", type=float, default=settings.argon2_target_verify_ms
+    )
+    argon2.add_argument("--memory-cost", type=int, default=settings.argon2_memory_cost)
+    argon2.add_argument("--parallelism", type=int, default=settings.argon2_parallelism)
+    argon2.set_defaults(handler=calibrate)
+
+    args = parser.parse_args(argv)
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
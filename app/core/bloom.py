@@ -0,0 +1,53 @@
+import hashlib
+import math
+from typing import Any
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    "Not present" answers are exact; "present" answers are wrong with
+    roughly error_rate probability while no more than capacity items have
+    been added. Items cannot be removed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        # two 64-bit halves of one digest, combined as h1 + i*h2
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> None:
+        added = False
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+    def stats(self) -> dict[str, Any]:
+        # expected false positive rate at the current fill
+        fill = 1 - math.exp(-self.num_hashes * self.count / self.num_bits)
+        return {
+            "capacity": self.capacity,
+            "items": self.count,
+            "bits": self.num_bits,
+            "hashes": self.num_hashes,
+            "false_positive_rate": fill**self.num_hashes,
+        }
@@ -16,14 +16,98 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int
 
     database_url: str
+    # connection pool (ignored for SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # asyncpg prepared statements; pgbouncer mode disables them for
+    # transaction pooling
+    db_statement_cache_size: int | None = None
+    db_pgbouncer_mode: bool = False
+    # comma-separated read replica URLs; empty means everything hits the primary
+    database_replica_urls: str = ""
+    db_replica_health_check_seconds: float = 10.0
 
     jwt_secret: str
     jwt_algorithm: str
+    # RS*/ES* signing: PEM private key and the kid published in the JWKS
+    jwt_private_key_file: str | None = None
+    jwt_key_id: str | None = None
+    # "kid=path,kid=path" public keys of rotated-out keys, still accepted
+    jwt_retired_public_key_files: str = ""
+    # comma-separated keys internal services send as X-Service-Key to call
+    # /auth/introspect; empty leaves the endpoint closed
+    introspection_service_keys: str = ""
+    jwks_max_age_seconds: int = 3600
     access_token_expire_minutes: int
     refresh_token_expire_days: int
     REFRESH_TOKEN_EXPIRE_SECONDS: int
     PASSWORD_RESET_TOKEN_EXPIRE_SECONDS : int  # 15 minutes
 
+    # argon2 runs off the event loop: "process" pool, or "thread" as a fallback
+    password_hash_executor: str = "process"
+    password_hash_workers: int | None = None  # defaults to os.cpu_count()
+    # admission control: jobs allowed to wait for a worker, and how long
+    password_hash_max_pending: int = 64
+    password_hash_queue_timeout_seconds: float = 2.0
+
+    # argon2 cost; unset values fall back to passlib's defaults
+    argon2_time_cost: int | None = None
+    argon2_memory_cost: int | None = None  # KiB
+    argon2_parallelism: int | None = None
+    # default target for `python -m app.cli calibrate-argon2`
+    argon2_target_verify_ms: float = 50.0
+
+    # token-bucket limits for login / forgot-password
+    rate_limit_backend: str = "memory"  # or "shared_memory" to share across workers
+    rate_limit_shm_name: str = "user_service_rate_limit"
+    login_rate_limit_per_minute: float = 5
+    login_rate_limit_burst: int = 5
+    login_ip_rate_limit_per_minute: float = 60
+    login_ip_rate_limit_burst: int = 60
+    forgot_password_rate_limit_per_minute: float = 1
+    forgot_password_rate_limit_burst: int = 3
+
+    # verified JWTs kept in memory until they expire
+    token_cache_size: int = 10_000
+
+    # POST /auth/introspect results are reused for this long
+    introspection_cache_ttl_seconds: float = 5.0
+    introspection_cache_size: int = 10_000
+
+    # read-only user snapshots served without touching the database
+    user_cache_size: int = 10_000
+    user_cache_ttl_seconds: float = 30.0
+
+    # refresh tokens that checked out are trusted this long without a query
+    refresh_token_cache_size: int = 100_000
+    refresh_token_revalidate_seconds: float = 60.0
+
+    # background deletion of dead refresh/password reset tokens
+    token_purge_interval_seconds: float = 3600.0  # 0 disables the in-app job
+    token_purge_batch_size: int = 1_000
+    token_purge_pause_seconds: float = 0.1
+    token_purge_grace_seconds: float = 86_400.0
+
+    # also match tokens by the legacy hex token_hash column; turn off once
+    # every token issued before the token_digest migration has expired
+    token_hash_dual_read: bool = True
+
+    # Postgres range partitions of refresh_tokens by expires_at
+    token_partition_interval_days: int = 7
+    token_partition_premake: int = 4
+    partition_maintenance_interval_seconds: float = 3600.0  # 0 disables
+
+    # "auto" uses LISTEN/NOTIFY on Postgres and stays in-process otherwise
+    invalidation_transport: str = "auto"
+    invalidation_channel: str = "user_service_invalidation"
+
+    # Bloom filters of taken emails/usernames (per field)
+    availability_filter_capacity: int = 1_000_000
+    availability_filter_error_rate: float = 0.01
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,272 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+from sqlalchemy import event, make_url, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# pg_notify payloads must stay under 8000 bytes
+_NOTIFY_BATCH = 100
+
+
+@dataclass(frozen=True, slots=True)
+class InvalidationEvent:
+    kind: str
+    key: str
+    version: int
+
+
+def encode_events(events: list[InvalidationEvent]) -> str:
+    return json.dumps(
+        [[e.kind, e.key, e.version] for e in events], separators=(",", ":")
+    )
+
+
+def decode_events(payload: str) -> list[InvalidationEvent]:
+    return [InvalidationEvent(kind, key, version) for kind, key, version in json.loads(payload)]
+
+
+class InvalidationTransport(Protocol):
+    name: str
+
+    def attach(self, bus: "InvalidationBus") -> None:
+        """Register a local bus that should receive events."""
+
+    def prepare(self, session: Session, events: list[InvalidationEvent]) -> None:
+        """Called inside the transaction, just before it commits."""
+
+    def committed(self, origin: "InvalidationBus", events: list[InvalidationEvent]) -> None:
+        """Called once the transaction has committed."""
+
+    async def listen(self, bus: "InvalidationBus") -> None:
+        """Deliver events published by other workers until cancelled."""
+
+
+class InMemoryTransport:
+    """Fans events out to every bus attached in this process.
+
+    Used in tests and single-worker setups; attaching several buses
+    simulates several workers.
+    """
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._buses: list[InvalidationBus] = []
+
+    def attach(self, bus: "InvalidationBus") -> None:
+        self._buses.append(bus)
+
+    def prepare(self, session: Session, events: list[InvalidationEvent]) -> None:
+        pass
+
+    def committed(self, origin: "InvalidationBus", events: list[InvalidationEvent]) -> None:
+        for bus in self._buses:
+            if bus is not origin:
+                for e in events:
+                    bus.deliver(e)
+
+    async def listen(self, bus: "InvalidationBus") -> None:
+        pass
+
+
+class PostgresNotifyTransport:
+    """LISTEN/NOTIFY on one channel.
+
+    pg_notify runs inside the writing transaction, so other workers only
+    hear about changes that actually committed. Each worker keeps one
+    dedicated connection listening; after it reconnects the local caches
+    are flushed because notifications sent in between are lost.
+    """
+
+    name = "postgres"
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        reconnect_seconds: float = 1.0,
+        probe_seconds: float = 15.0,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self.probe_seconds = probe_seconds
+        self.connected = False
+
+    def attach(self, bus: "InvalidationBus") -> None:
+        pass
+
+    def prepare(self, session: Session, events: list[InvalidationEvent]) -> None:
+        for start in range(0, len(events), _NOTIFY_BATCH):
+            session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {
+                    "channel": self.channel,
+                    "payload": encode_events(events[start : start + _NOTIFY_BATCH]),
+                },
+            )
+
+    def committed(self, origin: "InvalidationBus", events: list[InvalidationEvent]) -> None:
+        pass
+
+    async def listen(self, bus: "InvalidationBus") -> None:
+        # whatever goes wrong, keep reconnecting: a dead listener would leave
+        # this worker's caches without invalidations until a restart
+        while True:
+            try:
+                await self._listen_once(bus)
+                logger.warning("Invalidation listener lost its connection, reconnecting")
+            except Exception:
+                logger.warning("Invalidation listener failed, reconnecting", exc_info=True)
+            await asyncio.sleep(self.reconnect_seconds)
+
+    async def _listen_once(self, bus: "InvalidationBus") -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn, timeout=self.probe_seconds)
+        closed = asyncio.Event()
+        conn.add_termination_listener(lambda _: closed.set())
+        try:
+            await conn.add_listener(
+                self.channel, lambda _c, _pid, _ch, payload: bus.receive(payload)
+            )
+            self.connected = True
+            bus.resync()
+            while not closed.is_set():
+                try:
+                    await asyncio.wait_for(closed.wait(), self.probe_seconds)
+                except asyncio.TimeoutError:
+                    # a half-open link never fires the termination listener
+                    await conn.execute("SELECT 1", timeout=self.probe_seconds)
+        finally:
+            self.connected = False
+            # close() could wait on a dead peer
+            conn.terminate()
+
+
+class InvalidationBus:
+    """Routes change events to the caches of this worker.
+
+    Writers call publish(); events are delivered locally when the
+    transaction ends and to other workers through the transport. Events
+    carry the publisher's version so duplicates are applied only once.
+    """
+
+    def __init__(self, transport: InvalidationTransport):
+        self.transport = transport
+        self._handlers: dict[str, list[Callable[[InvalidationEvent], None]]] = defaultdict(list)
+        self._resync_handlers: list[Callable[[], None]] = []
+        self._seen: TTLCache[bool] = TTLCache(maxsize=10_000)
+        self.published = 0
+        self.delivered = 0
+        self.duplicates = 0
+        self.handler_errors = 0
+        self.resyncs = 0
+        transport.attach(self)
+
+    def subscribe(
+        self,
+        kind: str,
+        handler: Callable[[InvalidationEvent], None],
+        resync: Callable[[], None] | None = None,
+    ) -> None:
+        self._handlers[kind].append(handler)
+        if resync is not None:
+            self._resync_handlers.append(resync)
+
+    def publish(self, session: Session, kind: str, key: str) -> None:
+        session.info.setdefault("invalidation_events", []).append(
+            InvalidationEvent(kind, key, time.time_ns())
+        )
+
+    def deliver(self, e: InvalidationEvent) -> None:
+        if self._seen.pop(e) is not None:
+            self.duplicates += 1
+            self._seen.set(e, True)
+            return
+        self._seen.set(e, True)
+
+        self.delivered += 1
+        for handler in self._handlers.get(e.kind, ()):
+            try:
+                handler(e)
+            except Exception:
+                self.handler_errors += 1
+                logger.exception("Invalidation handler failed for %s", e)
+
+    def receive(self, payload: str) -> None:
+        try:
+            events = decode_events(payload)
+        except (TypeError, ValueError):
+            logger.warning("Dropping malformed invalidation payload %r", payload)
+            return
+        for e in events:
+            self.deliver(e)
+
+    def resync(self) -> None:
+        self.resyncs += 1
+        for handler in self._resync_handlers:
+            handler()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "transport": self.transport.name,
+            "listening": getattr(self.transport, "connected", True),
+            "published": self.published,
+            "delivered": self.delivered,
+            "duplicates": self.duplicates,
+            "handler_errors": self.handler_errors,
+            "resyncs": self.resyncs,
+        }
+
+
+def transport_from_settings(settings: Settings) -> InvalidationTransport:
+    backend = settings.invalidation_transport
+    url = make_url(settings.database_url)
+    if backend == "auto":
+        backend = "postgres" if url.get_backend_name() == "postgresql" else "memory"
+
+    if backend == "postgres":
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresNotifyTransport(dsn, settings.invalidation_channel)
+    return InMemoryTransport()
+
+
+invalidation_bus = InvalidationBus(transport_from_settings(get_settings()))
+
+
+@event.listens_for(Session, "before_commit")
+def _prepare_events(session: Session) -> None:
+    events = session.info.get("invalidation_events")
+    if events:
+        invalidation_bus.transport.prepare(session, events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_events(session: Session) -> None:
+    events = session.info.pop("invalidation_events", None)
+    if not events:
+        return
+
+    invalidation_bus.published += len(events)
+    for e in events:
+        invalidation_bus.deliver(e)
+    invalidation_bus.transport.committed(invalidation_bus, events)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_events(session: Session, previous_transaction: Any) -> None:
+    # nothing reached other workers, but this session may have cached its
+    # own uncommitted writes locally
+    for e in session.info.pop("invalidation_events", ()):
+        invalidation_bus.deliver(e)
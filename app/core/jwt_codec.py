@@ -0,0 +1,102 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from typing import Any
+
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+# the only claims we issue; anything else is left to jose to validate
+_KNOWN_CLAIMS = frozenset({"sub", "type", "iat", "exp", "jti"})
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class HMACJWTCodec:
+    """Specialised encoder/decoder for the HMAC-signed tokens we issue.
+
+    The header segment and the keyed HMAC state are computed once. Output is
+    byte-identical to jose.jwt.encode for the same claims. Tokens the fast
+    path does not recognise (other headers, extra claims, non-canonical
+    signatures) are handed to jose so results never differ from it.
+    """
+
+    def __init__(self, secret: str, algorithm: str):
+        if algorithm not in _DIGESTS:
+            raise ValueError(f"Unsupported HMAC algorithm: {algorithm}")
+
+        self.secret = secret
+        self.algorithm = algorithm
+        self._header = _b64encode(
+            json.dumps(
+                {"typ": "JWT", "alg": algorithm},
+                separators=(",", ":"),
+                sort_keys=True,
+            ).encode("utf-8")
+        )
+        self._mac = hmac.new(secret.encode("utf-8"), digestmod=_DIGESTS[algorithm])
+
+    @classmethod
+    def supports(cls, algorithm: str) -> bool:
+        return algorithm in _DIGESTS
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return _b64encode(mac.digest())
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        signing_input = self._header + b"." + payload
+        return (signing_input + b"." + self._sign(signing_input)).decode("ascii")
+
+    def _jose_decode(self, token: str) -> dict[str, Any]:
+        return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+
+    def decode(self, token: str) -> dict[str, Any]:
+        raw = token.encode("ascii", "replace")
+        parts = raw.split(b".")
+        if len(parts) != 3 or parts[0] != self._header:
+            return self._jose_decode(token)
+
+        signing_input = raw[: len(parts[0]) + 1 + len(parts[1])]
+        if not hmac.compare_digest(self._sign(signing_input), parts[2]):
+            return self._jose_decode(token)
+
+        try:
+            claims = json.loads(_b64decode(parts[1]))
+        except (binascii.Error, ValueError):
+            raise JWTError("Invalid payload string")
+
+        if not self._is_plain(claims):
+            return self._jose_decode(token)
+
+        # the only check jose would still make on these claims, leeway 0
+        if "exp" in claims and claims["exp"] < int(time.time()):
+            raise ExpiredSignatureError("Signature has expired.")
+        return claims
+
+    @staticmethod
+    def _is_plain(claims: Any) -> bool:
+        # exactly the shapes _create_token produces
+        return (
+            isinstance(claims, dict)
+            and claims.keys() <= _KNOWN_CLAIMS
+            and all(type(claims.get(name, 0)) is int for name in ("iat", "exp"))
+            and all(isinstance(claims.get(name, ""), str) for name in ("sub", "jti"))
+        )
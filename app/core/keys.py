@@ -0,0 +1,107 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from jose import jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import JWTError
+
+from app.core.config import Settings
+
+# algorithms python-jose can sign with a private key
+ASYMMETRIC_ALGORITHMS = frozenset(
+    {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+)
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    kid: str
+    public_key: Key
+
+
+class KeyRing:
+    """Private key used to sign new tokens, plus the public keys of every
+    key we still accept. Rotating means signing with a new kid while the
+    previous public key stays listed until its tokens have expired.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        kid: str,
+        private_key: Key,
+        retired: list[VerificationKey] | None = None,
+    ):
+        self.algorithm = algorithm
+        self.kid = kid
+        self.private_key = private_key
+        self.keys: dict[str, VerificationKey] = {
+            kid: VerificationKey(kid, private_key.public_key())
+        }
+        for key in retired or []:
+            self.keys.setdefault(key.kid, key)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "KeyRing | None":
+        if settings.jwt_algorithm not in ASYMMETRIC_ALGORITHMS:
+            return None
+
+        if not settings.jwt_private_key_file or not settings.jwt_key_id:
+            raise RuntimeError(
+                f"{settings.jwt_algorithm} requires jwt_private_key_file and jwt_key_id"
+            )
+
+        algorithm = settings.jwt_algorithm
+        private_key = jwk.construct(
+            Path(settings.jwt_private_key_file).read_text(), algorithm
+        )
+
+        retired = []
+        for entry in filter(None, settings.jwt_retired_public_key_files.split(",")):
+            kid, _, path = entry.strip().partition("=")
+            retired.append(
+                VerificationKey(kid, jwk.construct(Path(path).read_text(), algorithm))
+            )
+
+        return cls(algorithm, settings.jwt_key_id, private_key, retired)
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        return jwt.encode(
+            claims,
+            self.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.kid},
+        )
+
+    def verify(self, token: str) -> dict[str, Any]:
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+
+        return jwt.decode(token, key.public_key, algorithms=[self.algorithm])
+
+    def jwks(self) -> dict[str, Any]:
+        return {
+            "keys": [
+                {
+                    **key.public_key.to_dict(),
+                    "kid": key.kid,
+                    "use": "sig",
+                }
+                for key in self.keys.values()
+            ]
+        }
+
+
+def jwks_document(key_ring: KeyRing | None) -> tuple[bytes, str]:
+    """Serialized JWKS and its strong ETag."""
+    body = json.dumps(
+        key_ring.jwks() if key_ring else {"keys": []},
+        separators=(",", ":"),
+        sort_keys=True,
+    ).encode("utf-8")
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
@@ -0,0 +1,210 @@
+import fcntl
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Protocol
+
+from app.core.config import get_settings
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__("Rate limit exceeded")
+
+
+class RateLimitStorage(Protocol):
+    def consume(self, key: str, rate: float, burst: int, now: float) -> float:
+        """Take one token from the bucket for key.
+
+        Returns 0 when allowed, otherwise the seconds until a token frees up.
+        """
+
+
+def _refill(tokens: float, updated: float, rate: float, burst: int, now: float) -> float:
+    return min(float(burst), tokens + max(0.0, now - updated) * rate)
+
+
+class InMemoryRateLimitStorage:
+    """Token buckets for this process only, oldest keys evicted first."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def consume(self, key: str, rate: float, burst: int, now: float) -> float:
+        tokens, updated = self._buckets.pop(key, (float(burst), now))
+        tokens = _refill(tokens, updated, rate, burst, now)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class SharedMemoryRateLimitStorage:
+    """Token buckets in a fixed-size shared memory table, so every worker
+    process on the host sees the same counters.
+
+    Keys are stored as 64-bit fingerprints in an open-addressed table. When a
+    probe window is full the least recently updated bucket is reused, which
+    at worst forgets a cold key's history. A flock on a sidecar file
+    serialises access between processes.
+    """
+
+    _slot = struct.Struct("<Qdd")  # fingerprint, tokens, updated
+    _probe = 8
+
+    def __init__(self, name: str, slots: int = 65_536):
+        self.name = name
+        self.slots = slots
+        size = self._slot.size * slots
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # the segment must outlive whichever worker happened to create it
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    @staticmethod
+    def _fingerprint(key: str) -> int:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1  # 0 marks an empty slot
+
+    def _find_slot(self, fingerprint: int) -> int:
+        buf = self._shm.buf
+        start = fingerprint % self.slots
+        victim, victim_updated = start, math.inf
+
+        for i in range(self._probe):
+            index = (start + i) % self.slots
+            fp, _, updated = self._slot.unpack_from(buf, index * self._slot.size)
+            if fp == fingerprint or fp == 0:
+                return index
+            if updated < victim_updated:
+                victim, victim_updated = index, updated
+        return victim
+
+    def consume(self, key: str, rate: float, burst: int, now: float) -> float:
+        fingerprint = self._fingerprint(key)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            index = self._find_slot(fingerprint)
+            offset = index * self._slot.size
+            fp, tokens, updated = self._slot.unpack_from(self._shm.buf, offset)
+            if fp != fingerprint:
+                tokens, updated = float(burst), now
+            tokens = _refill(tokens, updated, rate, burst, now)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+
+            self._slot.pack_into(self._shm.buf, offset, fingerprint, tokens, now)
+            return wait
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self) -> None:
+        # unlink() also unregisters the segment, which we already did
+        resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        storage: RateLimitStorage,
+        scope: str,
+        per_minute: float,
+        burst: int,
+    ):
+        self.storage = storage
+        self.scope = scope
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key: str) -> None:
+        wait = self.storage.consume(
+            f"{self.scope}:{key}", self.rate, self.burst, time.time()
+        )
+        if wait:
+            self.rejected += 1
+            raise RateLimitExceeded(retry_after=max(1, math.ceil(wait)))
+        self.allowed += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "per_minute": self.rate * 60,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+@lru_cache
+def get_rate_limit_storage() -> RateLimitStorage:
+    settings = get_settings()
+    if settings.rate_limit_backend == "shared_memory":
+        return SharedMemoryRateLimitStorage(settings.rate_limit_shm_name)
+    return InMemoryRateLimitStorage()
+
+
+@lru_cache
+def get_rate_limiter(scope: str) -> RateLimiter:
+    settings = get_settings()
+    limits = {
+        "login:email": (
+            settings.login_rate_limit_per_minute,
+            settings.login_rate_limit_burst,
+        ),
+        "login:ip": (
+            settings.login_ip_rate_limit_per_minute,
+            settings.login_ip_rate_limit_burst,
+        ),
+        "forgot_password:email": (
+            settings.forgot_password_rate_limit_per_minute,
+            settings.forgot_password_rate_limit_burst,
+        ),
+        "forgot_password:ip": (
+            settings.login_ip_rate_limit_per_minute,
+            settings.login_ip_rate_limit_burst,
+        ),
+    }
+    per_minute, burst = limits[scope]
+    return RateLimiter(get_rate_limit_storage(), scope, per_minute, burst)
+
+
+def rate_limit_stats() -> dict[str, Any]:
+    return {
+        limiter.scope: limiter.stats()
+        for limiter in (
+            get_rate_limiter("login:email"),
+            get_rate_limiter("login:ip"),
+            get_rate_limiter("forgot_password:email"),
+            get_rate_limiter("forgot_password:ip"),
+        )
+    }
@@ -1,10 +1,20 @@
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from calendar import timegm
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable
 
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
+from app.core.jwt_codec import HMACJWTCodec
+from app.core.keys import KeyRing, jwks_document
 from jose import JWTError
 import uuid
 import hashlib
@@ -15,6 +25,74 @@ pwd_context = CryptContext(
     deprecated="auto",
 )
 
+_argon2_params: dict[str, int] = {}
+
+
+def configure_argon2(params: dict[str, int]) -> None:
+    """Apply argon2 cost parameters to pwd_context. Hashes made with a
+    lower cost keep verifying but report password_needs_rehash."""
+    _argon2_params.clear()
+    _argon2_params.update(params)
+    pwd_context.update(
+        **{f"argon2__{name}": value for name, value in params.items()}
+    )
+
+
+def argon2_params_from_settings() -> dict[str, int]:
+    # pinned explicitly so password_needs_rehash has a cost to compare with
+    handler = pwd_context.handler("argon2")
+    return {
+        "time_cost": settings.argon2_time_cost or handler.default_rounds,
+        "memory_cost": settings.argon2_memory_cost or handler.memory_cost,
+        "parallelism": settings.argon2_parallelism or handler.parallelism,
+    }
+
+
+def calibrate_argon2(
+    target_ms: float,
+    memory_cost: int | None = None,
+    parallelism: int | None = None,
+    max_time_cost: int = 10,
+) -> dict[str, int]:
+    """Raise time_cost until one verify on this host takes at least target_ms.
+
+    Run once per hardware class via ``python -m app.cli calibrate-argon2``
+    and put the result in Settings; every worker must hash with the same
+    cost.
+    """
+    handler = pwd_context.handler("argon2")
+    params = {
+        "memory_cost": memory_cost or handler.memory_cost,
+        "parallelism": parallelism or handler.parallelism,
+    }
+
+    for time_cost in range(1, max_time_cost + 1):
+        params["time_cost"] = time_cost
+        hashed = handler.using(**params).hash("calibration-password")
+        started = time.perf_counter()
+        handler.verify("calibration-password", hashed)
+        if (time.perf_counter() - started) * 1000 >= target_ms:
+            break
+
+    return params
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash is cheaper than the configured cost. Stronger
+    hashes are left alone, so hosts with different settings never rehash
+    the same password back and forth or downgrade it."""
+    try:
+        parsed = pwd_context.handler("argon2").from_string(hashed_password)
+    except ValueError:
+        return pwd_context.needs_update(hashed_password)
+    return (
+        parsed.rounds < _argon2_params["time_cost"]
+        or parsed.memory_cost < _argon2_params["memory_cost"]
+    )
+
+
+configure_argon2(argon2_params_from_settings())
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -23,6 +101,163 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
+
+# ---- off-loop password hashing ----
+
+_hash_executor: Executor | None = None
+_hash_executor_kind: str | None = None
+_hash_slots: asyncio.Semaphore | None = None
+_hash_jobs_in_flight = 0
+_hash_jobs_pending = 0
+_hash_jobs_shed = 0
+
+
+class PasswordHashingOverloaded(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__("Password hashing capacity exhausted")
+
+
+def _hash_workers() -> int:
+    return settings.password_hash_workers or os.cpu_count() or 1
+
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor, _hash_executor_kind
+
+    if _hash_executor is None:
+        if settings.password_hash_executor == "process":
+            try:
+                _hash_executor = ProcessPoolExecutor(
+                    max_workers=_hash_workers(),
+                    # workers must hash with the same (possibly calibrated) cost
+                    initializer=configure_argon2,
+                    initargs=(dict(_argon2_params),),
+                )
+                _hash_executor_kind = "process"
+            except (OSError, NotImplementedError):
+                # no working multiprocessing primitives on this host
+                _hash_executor = None
+
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=_hash_workers(),
+                thread_name_prefix="password-hash",
+            )
+            _hash_executor_kind = "thread"
+
+    return _hash_executor
+
+
+def _fall_back_to_threads() -> None:
+    global _hash_executor, _hash_executor_kind
+
+    broken = _hash_executor
+    _hash_executor = ThreadPoolExecutor(
+        max_workers=_hash_workers(),
+        thread_name_prefix="password-hash",
+    )
+    _hash_executor_kind = "thread"
+    if broken is not None:
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_hash_slots() -> asyncio.Semaphore:
+    global _hash_slots
+
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(_hash_workers())
+    return _hash_slots
+
+
+def _shed_hash_job() -> PasswordHashingOverloaded:
+    global _hash_jobs_shed
+
+    _hash_jobs_shed += 1
+    return PasswordHashingOverloaded(
+        retry_after=max(1, math.ceil(settings.password_hash_queue_timeout_seconds))
+    )
+
+
+async def _admit_hash_job() -> asyncio.Semaphore:
+    """Wait for a free worker, or fail fast when the queue is full or the
+    deadline passes, so a login flood cannot grow latency without bound."""
+    global _hash_jobs_pending
+
+    if _hash_jobs_pending >= settings.password_hash_max_pending:
+        raise _shed_hash_job()
+
+    slots = _get_hash_slots()
+    _hash_jobs_pending += 1
+    try:
+        await asyncio.wait_for(
+            slots.acquire(),
+            timeout=settings.password_hash_queue_timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        raise _shed_hash_job()
+    finally:
+        _hash_jobs_pending -= 1
+
+    return slots
+
+
+async def _run_hash_job(fn: Callable[..., Any], *args: Any) -> Any:
+    global _hash_jobs_in_flight
+
+    slots = await _admit_hash_job()
+    loop = asyncio.get_running_loop()
+    _hash_jobs_in_flight += 1
+    try:
+        try:
+            return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+        except BrokenProcessPool:
+            _fall_back_to_threads()
+            return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_jobs_in_flight -= 1
+        slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash_job(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(verify_password, password, hashed_password)
+
+
+def hash_executor_stats() -> dict[str, Any]:
+    return {
+        "executor": _hash_executor_kind or settings.password_hash_executor,
+        "workers": _hash_workers(),
+        "in_flight": _hash_jobs_in_flight,
+        "queue_depth": _hash_jobs_pending,
+        "max_pending": settings.password_hash_max_pending,
+        "shed_total": _hash_jobs_shed,
+        "argon2": dict(_argon2_params),
+    }
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor, _hash_executor_kind, _hash_slots
+
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+    _hash_executor = None
+    _hash_executor_kind = None
+    _hash_slots = None
+
+
+# fast path for our own HMAC tokens; other algorithms go through jose
+_jwt_codec: HMACJWTCodec | None = (
+    HMACJWTCodec(settings.jwt_secret, settings.jwt_algorithm)
+    if HMACJWTCodec.supports(settings.jwt_algorithm)
+    else None
+)
+key_ring = KeyRing.from_settings(settings)
+
+
 def _create_token(
     subject: str,
     expires_delta: timedelta,
@@ -32,11 +267,17 @@ def _create_token(
     payload: dict[str, Any] = {
         "sub": subject,
         "type": token_type,
-        "iat": now,
-        "exp": now + expires_delta,
+        "iat": timegm(now.utctimetuple()),
+        "exp": timegm((now + expires_delta).utctimetuple()),
         "jti": str(uuid.uuid4()),
     }
 
+    if _jwt_codec is not None:
+        return _jwt_codec.encode(payload)
+
+    if key_ring is not None:
+        return key_ring.sign(payload)
+
     return jwt.encode(
         payload,
         settings.jwt_secret,
@@ -69,24 +310,58 @@ class TokenPayloadError(Exception):
     pass
 
 
-def decode_token(token: str, expected_type: str) -> str:
+# token -> (subject, type, exp); entries expire with the token itself
+_token_cache: TTLCache[tuple[str | None, str | None, int | None]] = TTLCache(
+    maxsize=settings.token_cache_size
+)
+
+
+def decode_token_claims(token: str) -> tuple[str | None, str | None, int | None]:
+    """Verify a JWT once, then serve its claims from memory until it expires."""
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return claims
+
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm],
-        )
+        if _jwt_codec is not None:
+            payload = _jwt_codec.decode(token)
+        elif key_ring is not None:
+            payload = key_ring.verify(token)
+        else:
+            payload = jwt.decode(
+                token,
+                settings.jwt_secret,
+                algorithms=[settings.jwt_algorithm],
+            )
     except JWTError:
         raise TokenPayloadError("Invalid token")
 
-    if payload.get("type") != expected_type:
+    claims = (payload.get("sub"), payload.get("type"), payload.get("exp"))
+    if claims[2] is not None:
+        _token_cache.set(token, claims, expires_at=claims[2])
+    return claims
+
+
+def decode_token(token: str, expected_type: str) -> str:
+    user_id, token_type, _ = decode_token_claims(token)
+
+    if token_type != expected_type:
         raise TokenPayloadError("Invalid token type")
 
-    user_id = payload.get("sub")
     if not user_id:
         raise TokenPayloadError("Invalid token subject")
 
     return user_id
 
-def hash_refresh_token(token: str) -> str:
-    return hashlib.sha256(token.encode("utf-8")).hexdigest()
\ No newline at end of file
+
+def token_cache_stats() -> dict[str, Any]:
+    return _token_cache.stats()
+
+
+def get_jwks() -> tuple[bytes, str]:
+    return jwks_document(key_ring)
+
+
+def hash_refresh_token(token: str) -> bytes:
+    """Raw 32-byte SHA-256 digest, as stored in token_digest columns."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
\ No newline at end of file
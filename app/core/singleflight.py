@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+_registry: dict[str, "SingleFlight[Any]"] = {}
+
+
+class SingleFlight(Generic[V]):
+    """Collapses concurrent calls for the same key into one.
+
+    The first caller runs the lookup; callers arriving while it is in flight
+    await the same result. Results are handed to several coroutines, so
+    they must be immutable. If the leading caller is cancelled, a waiting
+    caller takes over instead of failing.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future[V]] = {}
+        self.calls = 0
+        self.coalesced = 0
+        _registry[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        while True:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is None:
+                return await self._lead(key, fn)
+
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if not call.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # the leader was cancelled, not us: retry
+                self.calls -= 1
+                self.coalesced -= 1
+
+    async def _lead(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        call = asyncio.get_running_loop().create_future()
+        # followers may all have gone; do not warn about an unread exception
+        call.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = call
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as exc:
+            call.set_exception(exc)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+
+def singleflight_stats() -> dict[str, Any]:
+    return {name: flight.stats() for name, flight in _registry.items()}
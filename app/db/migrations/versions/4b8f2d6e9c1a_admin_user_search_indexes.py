@@ -0,0 +1,49 @@
+"""admin user search indexes
+
+Revision ID: 4b8f2d6e9c1a
+Revises: e1d4b8a2c6f0
+Create Date: 2026-10-18 16:05:37.552901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8f2d6e9c1a'
+down_revision: Union[str, Sequence[str], None] = 'e1d4b8a2c6f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_users_email_trgm': 'USING gin (email gin_trgm_ops)',
+    'ix_users_username_trgm': 'USING gin (username gin_trgm_ops)',
+    'ix_users_admins': '(id) WHERE is_admin',
+    'ix_users_inactive': '(id) WHERE NOT is_active',
+    'ix_users_created_at': '(created_at)',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY keeps users writable while the indexes build, but cannot
+    # run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON users {definition}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
@@ -0,0 +1,105 @@
+"""partition refresh_tokens by expires_at
+
+Revision ID: 7c2e4b9d1a3f
+Revises: 026496d3abd4
+Create Date: 2026-10-18 10:12:44.310127
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import get_settings
+from app.db.partitions import create_partitions, refresh_token_spec, slices_ahead
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e4b9d1a3f'
+down_revision: Union[str, Sequence[str], None] = '026496d3abd4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, user_id, token_hash, is_revoked, expires_at, created_at"
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('token_hash', sa.String(), nullable=False),
+        sa.Column('is_revoked', sa.Boolean(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    ]
+
+
+def _move_aside(bind) -> bool:
+    if not sa.inspect(bind).has_table('refresh_tokens'):
+        return False
+    op.rename_table('refresh_tokens', 'refresh_tokens_old')
+    op.execute('ALTER INDEX IF EXISTS ix_refresh_tokens_user_id RENAME TO ix_refresh_tokens_old_user_id')
+    op.execute('ALTER INDEX IF EXISTS ix_refresh_tokens_token_hash RENAME TO ix_refresh_tokens_old_token_hash')
+    return True
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    had_table = _move_aside(bind)
+
+    op.create_table(
+        'refresh_tokens',
+        *_columns(),
+        sa.PrimaryKeyConstraint('id', 'expires_at', name='pk_refresh_tokens'),
+        sa.UniqueConstraint('token_hash', 'expires_at', name='uq_refresh_tokens_token_hash_expires_at'),
+        postgresql_partition_by='RANGE (expires_at)',
+    )
+    op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'])
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'])
+
+    settings = get_settings()
+    create_partitions(
+        bind,
+        refresh_token_spec(settings),
+        datetime.now(timezone.utc),
+        slices_ahead(settings),
+    )
+
+    if had_table:
+        # expired tokens are useless; only live ones move over
+        op.execute(
+            f'INSERT INTO refresh_tokens ({COLUMNS}) '
+            f'SELECT {COLUMNS} FROM refresh_tokens_old WHERE expires_at > now()'
+        )
+        op.drop_table('refresh_tokens_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.rename_table('refresh_tokens', 'refresh_tokens_partitioned')
+    op.execute('ALTER INDEX ix_refresh_tokens_user_id RENAME TO ix_refresh_tokens_partitioned_user_id')
+    op.execute('ALTER INDEX ix_refresh_tokens_token_hash RENAME TO ix_refresh_tokens_partitioned_token_hash')
+
+    op.create_table(
+        'refresh_tokens',
+        *_columns(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token_hash'),
+    )
+    op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'])
+    op.execute(
+        f'INSERT INTO refresh_tokens ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM refresh_tokens_partitioned'
+    )
+    # dropping the parent drops every partition with it
+    op.drop_table('refresh_tokens_partitioned')
@@ -0,0 +1,94 @@
+"""store token hashes as 32-byte digests
+
+Revision ID: e1d4b8a2c6f0
+Revises: 7c2e4b9d1a3f
+Create Date: 2026-10-18 14:40:02.918273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1d4b8a2c6f0'
+down_revision: Union[str, Sequence[str], None] = '7c2e4b9d1a3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing rows keep their hex token_hash and are found through the
+# dual-read lookup until they expire; new rows only fill token_digest.
+# Once token_hash_dual_read is off, a follow-up migration drops token_hash
+# and its index.
+
+
+def _hex_digest(bind) -> str:
+    # SQL turning token_digest back into the old lowercase hex token_hash
+    if bind.dialect.name == 'postgresql':
+        return "encode(token_digest, 'hex')"
+    return 'lower(hex(token_digest))'
+
+
+def _has_unique(inspector, table: str, name: str) -> bool:
+    # SQLite tables made by create_all carry unnamed constraints instead
+    return any(c['name'] == name for c in inspector.get_unique_constraints(table))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    # batch mode turns into plain ALTERs on Postgres and a table copy on SQLite
+    if inspector.has_table('refresh_tokens'):
+        with op.batch_alter_table('refresh_tokens') as batch_op:
+            batch_op.add_column(sa.Column('token_digest', sa.LargeBinary(32), nullable=True))
+            batch_op.alter_column('token_hash', existing_type=sa.String(), nullable=True)
+            batch_op.create_unique_constraint(
+                'uq_refresh_tokens_token_digest_expires_at',
+                ['token_digest', 'expires_at'],
+            )
+            if _has_unique(inspector, 'refresh_tokens', 'uq_refresh_tokens_token_hash_expires_at'):
+                batch_op.drop_constraint('uq_refresh_tokens_token_hash_expires_at', type_='unique')
+
+    if inspector.has_table('password_reset_tokens'):
+        with op.batch_alter_table('password_reset_tokens') as batch_op:
+            batch_op.add_column(sa.Column('token_digest', sa.LargeBinary(32), nullable=True))
+            batch_op.alter_column('token_hash', existing_type=sa.String(), nullable=True)
+            batch_op.create_unique_constraint(
+                'uq_password_reset_tokens_token_digest',
+                ['token_digest'],
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    hex_digest = _hex_digest(bind)
+
+    if inspector.has_table('password_reset_tokens'):
+        op.execute(
+            f"UPDATE password_reset_tokens SET token_hash = {hex_digest} "
+            "WHERE token_hash IS NULL"
+        )
+        with op.batch_alter_table('password_reset_tokens') as batch_op:
+            if _has_unique(inspector, 'password_reset_tokens', 'uq_password_reset_tokens_token_digest'):
+                batch_op.drop_constraint('uq_password_reset_tokens_token_digest', type_='unique')
+            batch_op.alter_column('token_hash', existing_type=sa.String(), nullable=False)
+            batch_op.drop_column('token_digest')
+
+    if inspector.has_table('refresh_tokens'):
+        op.execute(
+            f"UPDATE refresh_tokens SET token_hash = {hex_digest} "
+            "WHERE token_hash IS NULL"
+        )
+        with op.batch_alter_table('refresh_tokens') as batch_op:
+            batch_op.create_unique_constraint(
+                'uq_refresh_tokens_token_hash_expires_at',
+                ['token_hash', 'expires_at'],
+            )
+            if _has_unique(inspector, 'refresh_tokens', 'uq_refresh_tokens_token_digest_expires_at'):
+                batch_op.drop_constraint('uq_refresh_tokens_token_digest_expires_at', type_='unique')
+            batch_op.alter_column('token_hash', existing_type=sa.String(), nullable=False)
+            batch_op.drop_column('token_digest')
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+LOCK_TIMEOUT = "5s"
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    """A table range-partitioned by a timestamp column in fixed-width
+    slices. Partitions are named <table>_p<start>_<end> (UTC dates)."""
+
+    table: str
+    interval_days: int
+    column: str = "expires_at"
+
+    def bounds(self, at: datetime) -> tuple[datetime, datetime]:
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        slot = (at - _EPOCH).days // self.interval_days
+        start = _EPOCH + timedelta(days=slot * self.interval_days)
+        return start, start + timedelta(days=self.interval_days)
+
+    def name(self, start: datetime, end: datetime) -> str:
+        return f"{self.table}_p{start:%Y%m%d}_{end:%Y%m%d}"
+
+    def parse_end(self, name: str) -> datetime | None:
+        prefix = f"{self.table}_p"
+        if not name.startswith(prefix):
+            return None
+        try:
+            _, end = name[len(prefix) :].split("_")
+            return datetime.strptime(end, "%Y%m%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+
+
+def refresh_token_spec(settings: Settings) -> PartitionSpec:
+    return PartitionSpec("refresh_tokens", settings.token_partition_interval_days)
+
+
+def slices_ahead(settings: Settings) -> int:
+    """Future slices to keep ready: enough that a token issued now, which
+    expires one refresh lifetime from now, always has a partition."""
+    lifetime_days = settings.REFRESH_TOKEN_EXPIRE_SECONDS / 86_400
+    needed = math.ceil(lifetime_days / settings.token_partition_interval_days) + 1
+    return max(settings.token_partition_premake, needed)
+
+
+def list_partitions(conn: Connection, spec: PartitionSpec) -> dict[str, bool]:
+    """Partition names, each mapped to whether a DETACH ... CONCURRENTLY
+    was interrupted and left it pending detach."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, i.inhdetachpending FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass) "
+            "ORDER BY c.relname"
+        ),
+        {"table": spec.table},
+    )
+    return dict(rows.all())
+
+
+def _lock_timed_out(error: DBAPIError) -> bool:
+    return getattr(error.orig, "pgcode", None) == "55P03"  # lock_not_available
+
+
+def _attach_slice(
+    conn: Connection,
+    spec: PartitionSpec,
+    name: str,
+    start: datetime,
+    end: datetime,
+) -> None:
+    # CREATE TABLE ... PARTITION OF takes ACCESS EXCLUSIVE on the parent;
+    # ATTACH PARTITION only needs SHARE UPDATE EXCLUSIVE, and the CHECK
+    # constraint spares it the scan proving the rows fit the range
+    lower, upper = f"'{start.isoformat()}'", f"'{end.isoformat()}'"
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{spec.table}" INCLUDING ALL)'))
+    conn.execute(
+        text(
+            f'ALTER TABLE "{name}" ADD CONSTRAINT "{name}_range" '
+            f'CHECK ("{spec.column}" >= {lower} AND "{spec.column}" < {upper})'
+        )
+    )
+    conn.execute(
+        text(
+            f'ALTER TABLE "{spec.table}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ({lower}) TO ({upper})"
+        )
+    )
+
+
+def create_partitions(
+    conn: Connection,
+    spec: PartitionSpec,
+    since: datetime,
+    ahead: int,
+) -> list[str]:
+    """Make sure every slice from the one holding since up to ahead slices
+    past the current one exists. Works on a plain sync connection so
+    migrations can use it too.
+
+    If the caller set lock_timeout and the parent stays locked past it,
+    the remaining slices are left for the next run.
+    """
+    existing = set(list_partitions(conn, spec))
+    start, end = spec.bounds(since)
+    last = spec.bounds(datetime.now(timezone.utc))[1] + timedelta(
+        days=ahead * spec.interval_days
+    )
+
+    created = []
+    while start < last:
+        name = spec.name(start, end)
+        if name not in existing:
+            try:
+                with conn.begin_nested():
+                    _attach_slice(conn, spec, name, start, end)
+            except DBAPIError as e:
+                if not _lock_timed_out(e):
+                    raise
+                logger.warning("Timed out locking %s to attach %s", spec.table, name)
+                break
+            created.append(name)
+        start, end = end, end + timedelta(days=spec.interval_days)
+    return created
+
+
+class PartitionMaintainer:
+    """Pre-creates future partitions and drops ones whose whole range has
+    expired, so old rows leave by DROP TABLE instead of DELETE + vacuum.
+
+    Only does anything on Postgres.
+    """
+
+    def __init__(
+        self,
+        specs: list[PartitionSpec],
+        ahead: int,
+        retention: timedelta,
+    ):
+        self.specs = specs
+        self.ahead = ahead
+        self.retention = retention
+        self.runs = 0
+        self.created: list[str] = []
+        self.dropped: list[str] = []
+
+    @classmethod
+    def from_settings(cls) -> "PartitionMaintainer":
+        settings = get_settings()
+        return cls(
+            [refresh_token_spec(settings)],
+            ahead=slices_ahead(settings),
+            retention=timedelta(seconds=settings.token_purge_grace_seconds),
+        )
+
+    async def run(self, engine: AsyncEngine) -> dict[str, list[str]]:
+        if engine.dialect.name != "postgresql":
+            return {"created": [], "dropped": []}
+
+        created, dropped = [], []
+        for spec in self.specs:
+            async with engine.begin() as conn:
+                # never queue logins and refreshes behind a long wait for the lock
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                created += await conn.run_sync(
+                    create_partitions, spec, datetime.now(timezone.utc), self.ahead
+                )
+            dropped += await self._drop_expired(engine, spec)
+
+        self.runs += 1
+        self.created, self.dropped = created, dropped
+        if created or dropped:
+            logger.info("Partitions created: %s, dropped: %s", created, dropped)
+        return {"created": created, "dropped": dropped}
+
+    async def _drop_expired(self, engine: AsyncEngine, spec: PartitionSpec) -> list[str]:
+        cutoff = datetime.now(timezone.utc) - self.retention
+        async with engine.connect() as conn:
+            partitions = await conn.run_sync(list_partitions, spec)
+
+        dropped = []
+        # DETACH ... CONCURRENTLY avoids an exclusive lock on the parent
+        # but cannot run inside a transaction block
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+            try:
+                for name, detach_pending in partitions.items():
+                    end = spec.parse_end(name)
+                    if end is None or end > cutoff:
+                        continue
+                    # a detach that failed part way must be finished, not
+                    # restarted, or it blocks every later run
+                    mode = "FINALIZE" if detach_pending else "CONCURRENTLY"
+                    await conn.execute(
+                        text(
+                            f'ALTER TABLE "{spec.table}" '
+                            f'DETACH PARTITION "{name}" {mode}'
+                        )
+                    )
+                    await conn.execute(text(f'DROP TABLE "{name}"'))
+                    dropped.append(name)
+            finally:
+                # the connection goes back to the pool
+                await conn.execute(text("RESET lock_timeout"))
+        return dropped
+
+    async def run_forever(self, engine: AsyncEngine, interval_seconds: float) -> None:
+        while True:
+            try:
+                await self.run(engine)
+            except Exception:
+                logger.exception("Partition maintenance failed")
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "last_created": self.created,
+            "last_dropped": self.dropped,
+        }
+
+
+partition_maintainer = PartitionMaintainer.from_settings()
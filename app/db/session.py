@@ -1,29 +1,260 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, AsyncGenerator
+from uuid import uuid4
+
+from sqlalchemy import AsyncAdaptedQueuePool, QueuePool, Select, event, make_url, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that also records how long checkouts wait for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_errors = 0
+        self.checkout_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.checkout_errors += 1
+            raise
+        finally:
+            self.checkouts += 1
+            self.checkout_wait_seconds += time.perf_counter() - started
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    options: dict[str, Any] = {"echo": settings.debug, "future": True}
+
+    url = make_url(settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+    if url.get_driver_name() == "asyncpg":
+        connect_args: dict[str, Any] = {}
+        if settings.db_pgbouncer_mode:
+            # pgbouncer may hand each transaction a different server connection
+            connect_args = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        elif settings.db_statement_cache_size is not None:
+            connect_args = {
+                "statement_cache_size": settings.db_statement_cache_size,
+                "prepared_statement_cache_size": settings.db_statement_cache_size,
+            }
+        options["connect_args"] = connect_args
+
+    return options
+
+
+class ReplicaSet:
+    """Read replicas handed out round-robin, skipping ones that failed
+    their last health check or dropped a connection."""
+
+    def __init__(self, engines: list[AsyncEngine]):
+        self.engines = engines
+        self.healthy: set[AsyncEngine] = set(engines)
+        self._turn = itertools.count()
+
+        for replica in engines:
+            event.listen(replica.sync_engine, "handle_error", self._on_error(replica))
+
+    def _on_error(self, replica: AsyncEngine):
+        def handle_error(context) -> None:
+            if context.is_disconnect:
+                self.healthy.discard(replica)
+        return handle_error
+
+    def choose(self) -> Engine | None:
+        candidates = [e for e in self.engines if e in self.healthy]
+        if not candidates:
+            return None
+        return candidates[next(self._turn) % len(candidates)].sync_engine
+
+    async def check_health(self) -> None:
+        for replica in self.engines:
+            try:
+                async with replica.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception:
+                if replica in self.healthy:
+                    logger.warning("Read replica %s is unhealthy", replica.url)
+                self.healthy.discard(replica)
+            else:
+                self.healthy.add(replica)
+
+    async def monitor(self, interval: float) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+
+class RoutingSession(Session):
+    """Sends SELECTs marked with replica_read() to a replica and everything
+    else to the primary.
+
+    Reads go to the primary unless they opt in, so a read whose result
+    feeds a write never sees a lagging replica. Once the session has
+    written anything it sticks to the primary so the request reads its own
+    writes.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        primary: Engine,
+        replicas: ReplicaSet | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replicas = replicas
+        self.use_primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs: Any) -> Engine:
+        if self.replicas is None or self.use_primary or self._flushing:
+            self.use_primary = True
+            return self.primary
+
+        if isinstance(clause, Select):
+            if (
+                clause._for_update_arg is None
+                and clause.get_execution_options().get("read_replica")
+            ):
+                return self.replicas.choose() or self.primary
+            return self.primary
+
+        self.use_primary = True
+        return self.primary
+
+
+def replica_read(stmt: Select) -> Select:
+    """Allow a pure read, whose result is neither written back nor cached,
+    to be served by a possibly lagging replica."""
+    return stmt.execution_options(read_replica=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_writes(session: Session, flush_context: Any) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(state: Any) -> None:
+    if not state.is_select:
+        state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_writes(session: Session, transaction: Any) -> None:
+    if transaction.parent is None:
+        session.info.pop("has_writes", None)
+
+
+def has_pending_writes(session: AsyncSession) -> bool:
+    """Whether the current transaction has written anything, i.e. whether
+    its reads may differ from what other sessions see."""
+    return session.sync_session.info.get("has_writes", False)
+
 
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.debug,
-    future=True,
+    **engine_options(settings),
 )
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-)
+replica_set: ReplicaSet | None = None
+if settings.database_replica_urls:
+    replica_set = ReplicaSet(
+        [
+            create_async_engine(
+                url.strip(),
+                **engine_options(settings.model_copy(update={"database_url": url.strip()})),
+            )
+            for url in settings.database_replica_urls.split(",")
+            if url.strip()
+        ]
+    )
 
+if replica_set is not None:
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=engine.sync_engine,
+        replicas=replica_set,
+        expire_on_commit=False,
+    )
+else:
+    AsyncSessionLocal = async_sessionmaker(
+        bind=engine,
+        expire_on_commit=False,
+    )
 
-async def get_db_session() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
 
+def pool_stats(target: AsyncEngine = engine) -> dict[str, Any]:
+    pool = target.pool
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow_in_use=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+        )
+
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            checkout_errors=pool.checkout_errors,
+            checkout_wait_seconds_total=round(pool.checkout_wait_seconds, 6),
+        )
+
+    if target is engine and replica_set is not None:
+        stats["replicas"] = [
+            {"url": replica.url.render_as_string(), "healthy": replica in replica_set.healthy}
+            for replica in replica_set.engines
+        ]
+
+    return stats
+
+
+async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Request-scoped session. Creating it is free: a pool connection is
+    only checked out when the first statement runs, and is returned as soon
+    as the transaction ends."""
+    async with AsyncSessionLocal() as session:
+        yield session
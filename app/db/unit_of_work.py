@@ -0,0 +1,68 @@
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_current: ContextVar["UnitOfWork | None"] = ContextVar("unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """One transaction per request.
+
+    Repositories only flush; the unit of work commits once when the block
+    exits cleanly and rolls back if it raises. Statements, commits and
+    rollbacks issued while it is active are counted as DB round trips.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.statements = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self._token: Token | None = None
+
+    @property
+    def round_trips(self) -> int:
+        return self.statements + self.commits + self.rollbacks
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._token = _current.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                await self.rollback()
+        finally:
+            _current.reset(self._token)
+            self._token = None
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    uow = _current.get()
+    if uow is not None:
+        uow.statements += 1
+
+
+@event.listens_for(Engine, "commit")
+def _count_commit(conn):
+    uow = _current.get()
+    if uow is not None:
+        uow.commits += 1
+
+
+@event.listens_for(Engine, "rollback")
+def _count_rollback(conn):
+    uow = _current.get()
+    if uow is not None:
+        uow.rollbacks += 1
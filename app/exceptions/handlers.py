@@ -8,8 +8,13 @@ from app.core.security import TokenPayloadError
 
 
 def service_error_handler(_: Request, exc: ServiceError):
+    headers = None
+    if exc.retry_after is not None:
+        headers = {"Retry-After": str(exc.retry_after)}
+
     return JSONResponse(
-        status_code=400,
+        status_code=exc.status_code,
+        headers=headers,
         content=ResponseSchema(
             success=False,
             data=None,
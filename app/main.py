@@ -1,11 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.core.config import get_settings
 from app.core.logging import setup_logging
 from app.exceptions.handlers import service_error_handler,token_error_handler,permission_error_handler
 from app.services.errors import ServiceError
-from app.api.v1 import auth, users
-from app.core.security import TokenPayloadError
+from app.api.v1 import auth, users, metrics, jwks
+from app.db.partitions import partition_maintainer
+from app.db.session import engine, replica_set
+from app.core.invalidation import invalidation_bus
+from app.services.availability import availability_index
+from app.services.token_purge import token_purger
+from app.core.security import TokenPayloadError, shutdown_hash_executor
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    settings = get_settings()
+    replica_monitor = None
+    if replica_set is not None:
+        replica_monitor = asyncio.create_task(
+            replica_set.monitor(settings.db_replica_health_check_seconds)
+        )
+
+    invalidation_listener = asyncio.create_task(
+        invalidation_bus.transport.listen(invalidation_bus)
+    )
+    availability_loader = asyncio.create_task(availability_index.reload())
+    background_jobs = []
+    if settings.token_purge_interval_seconds > 0:
+        background_jobs.append(
+            asyncio.create_task(
+                token_purger.run_forever(settings.token_purge_interval_seconds)
+            )
+        )
+    if settings.partition_maintenance_interval_seconds > 0:
+        background_jobs.append(
+            asyncio.create_task(
+                partition_maintainer.run_forever(
+                    engine, settings.partition_maintenance_interval_seconds
+                )
+            )
+        )
+
+    yield
+
+    invalidation_listener.cancel()
+    availability_loader.cancel()
+    for job in background_jobs:
+        job.cancel()
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+        await replica_set.dispose()
+    shutdown_hash_executor()
 
 
 def create_app() -> FastAPI:
@@ -15,6 +64,7 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
         debug=settings.debug,
+        lifespan=lifespan,
     )
 
     app.add_exception_handler(ServiceError, service_error_handler)
@@ -23,6 +73,9 @@ def create_app() -> FastAPI:
 
     app.include_router(auth.router, prefix=settings.api_v1_prefix)
     app.include_router(users.router, prefix=settings.api_v1_prefix)
+    app.include_router(metrics.router, prefix=settings.api_v1_prefix)
+    # well-known paths live at the root, not under the API prefix
+    app.include_router(jwks.router)
 
     return app
 
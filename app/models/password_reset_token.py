@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, LargeBinary, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -16,7 +16,11 @@ class PasswordResetToken(Base):
         nullable=False,
     )
 
-    token_hash: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    token_digest: Mapped[bytes | None] = mapped_column(
+        LargeBinary(32), unique=True, nullable=True
+    )
+    # legacy hex SHA-256, see RefreshToken.token_hash
+    token_hash: Mapped[str | None] = mapped_column(String, unique=True, nullable=True)
     used: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, LargeBinary, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -7,6 +7,14 @@ from app.db.base import Base
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    # on Postgres the table is range-partitioned by expiry (see
+    # app/db/partitions.py); keys must therefore include expires_at
+    __table_args__ = (
+        UniqueConstraint(
+            "token_digest", "expires_at", name="uq_refresh_tokens_token_digest_expires_at"
+        ),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     user_id: Mapped[str] = mapped_column(
@@ -16,10 +24,15 @@ class RefreshToken(Base):
         nullable=False,
     )
 
-    token_hash: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    token_digest: Mapped[bytes | None] = mapped_column(LargeBinary(32), nullable=True)
+    # hex SHA-256 of rows written before token_digest existed; only read
+    # while settings.token_hash_dual_read is on
+    token_hash: Mapped[str | None] = mapped_column(String, index=True, nullable=True)
     is_revoked: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, false
+from sqlalchemy import Index, String, Boolean, false, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -7,6 +7,32 @@ from app.models.base import TimestampMixin, SoftDeleteMixin
 
 class User(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "users"
+    # fetch created_at/updated_at in the INSERT/UPDATE itself via RETURNING
+    # (SQLAlchemy falls back to a SELECT on backends without it)
+    __mapper_args__ = {"eager_defaults": True}
+    # admin search: trigram indexes for fragment matches, partial indexes
+    # for the rare flag values, created_at for date ranges (Postgres only)
+    __table_args__ = (
+        Index(
+            "ix_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_admins", "id", postgresql_where=text("is_admin")
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_inactive", "id", postgresql_where=text("NOT is_active")
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_users_created_at", "created_at").ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(26),
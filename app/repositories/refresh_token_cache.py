@@ -0,0 +1,113 @@
+import datetime as dt
+import time
+from typing import Any
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+
+settings = get_settings()
+
+
+def _timestamp(value: dt.datetime) -> float:
+    # refresh token expiries are stored as naive UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    return value.timestamp()
+
+
+class RefreshTokenCache:
+    """What recent refreshes learned from the database.
+
+    Revoked token hashes and deactivated users are remembered until the
+    tokens involved would have expired anyway. Tokens that checked out
+    fine are trusted for revalidate_seconds. Change events for a user drop
+    everything known about that user, so the next refresh goes back to
+    the database.
+    """
+
+    def __init__(self, maxsize: int, revalidate_seconds: float, token_lifetime: float):
+        self.revalidate_seconds = revalidate_seconds
+        self.token_lifetime = token_lifetime
+        self.known_good: TTLCache[tuple[str, float]] = TTLCache(maxsize)
+        self.revoked: TTLCache[bool] = TTLCache(maxsize)
+        self.inactive_users: TTLCache[bool] = TTLCache(maxsize)
+        # when each user last changed; good entries validated earlier are stale
+        self._changed_at: TTLCache[float] = TTLCache(maxsize, ttl=revalidate_seconds)
+        self.revalidations = 0
+
+    def is_revoked(self, token_hash: bytes) -> bool:
+        return self.revoked.get(token_hash) is not None
+
+    def is_inactive(self, user_id: str) -> bool:
+        return self.inactive_users.get(user_id) is not None
+
+    def is_known_good(self, token_hash: bytes, user_id: str) -> bool:
+        entry = self.known_good.get(token_hash)
+        if entry is None or entry[0] != user_id:
+            return False
+        changed_at = self._changed_at.get(user_id)
+        return changed_at is None or changed_at < entry[1]
+
+    def mark_good(
+        self,
+        token_hash: bytes,
+        user_id: str,
+        expires_at: dt.datetime,
+        validated_at: float,
+    ) -> None:
+        """validated_at must be taken before the database read started."""
+        self.revalidations += 1
+        self.known_good.set(
+            token_hash,
+            (user_id, validated_at),
+            expires_at=min(
+                validated_at + self.revalidate_seconds, _timestamp(expires_at)
+            ),
+        )
+
+    def mark_revoked(self, token_hash: bytes, expires_at: dt.datetime) -> None:
+        self.known_good.pop(token_hash)
+        self.revoked.set(token_hash, True, expires_at=_timestamp(expires_at))
+
+    def mark_inactive(self, user_id: str) -> None:
+        # every refresh token issued before now is gone after one lifetime
+        self.inactive_users.set(
+            user_id, True, expires_at=time.time() + self.token_lifetime
+        )
+
+    def forget_user(self, user_id: str) -> None:
+        self.inactive_users.pop(user_id)
+        self._changed_at.set(user_id, time.time())
+
+    def clear(self) -> None:
+        self.known_good.clear()
+        self.inactive_users.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "revalidate_seconds": self.revalidate_seconds,
+            "revalidations": self.revalidations,
+            "known_good": self.known_good.stats(),
+            "revoked": self.revoked.stats(),
+            "inactive_users": self.inactive_users.stats(),
+        }
+
+
+refresh_token_cache = RefreshTokenCache(
+    maxsize=settings.refresh_token_cache_size,
+    revalidate_seconds=settings.refresh_token_revalidate_seconds,
+    token_lifetime=settings.REFRESH_TOKEN_EXPIRE_SECONDS,
+)
+
+
+def _forget_user(e: InvalidationEvent) -> None:
+    refresh_token_cache.forget_user(e.key)
+
+
+invalidation_bus.subscribe("user", _forget_user, resync=refresh_token_cache.clear)
+invalidation_bus.subscribe("refresh_tokens", _forget_user)
+
+
+def refresh_token_cache_stats() -> dict[str, Any]:
+    return refresh_token_cache.stats()
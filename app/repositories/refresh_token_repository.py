@@ -1,27 +1,84 @@
-from sqlalchemy import select, update
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import ColumnElement, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.core.invalidation import invalidation_bus
+from app.core.singleflight import SingleFlight
+from app.db.session import has_pending_writes
 from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+def digest_matches(model: type, token_digest: bytes) -> ColumnElement[bool]:
+    """Match on the binary digest, and on the old hex column while rows
+    written before the digest column may still be live."""
+    condition = model.token_digest == token_digest
+    if get_settings().token_hash_dual_read:
+        condition = or_(condition, model.token_hash == token_digest.hex())
+    return condition
+
+
+class RefreshTokenState(NamedTuple):
+    user_id: str
+    is_revoked: bool
+    expires_at: datetime
+    user_is_active: bool | None  # None if the user row is gone
+    # taken before the query ran; callers sharing it must not use their own
+    read_at: float
+
+
+_state_flight: SingleFlight[RefreshTokenState | None] = SingleFlight(
+    "refresh_token_by_hash"
+)
 
 
 class RefreshTokenRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_by_hash(self, token_hash: str) -> RefreshToken | None:
-        stmt = select(RefreshToken).where(RefreshToken.token_hash == token_hash)
+    async def get_by_hash(self, token_hash: bytes) -> RefreshToken | None:
+        stmt = select(RefreshToken).where(digest_matches(RefreshToken, token_hash))
         res = await self.session.execute(stmt)
         return res.scalar_one_or_none()
 
+    async def get_state_by_hash(self, token_hash: bytes) -> RefreshTokenState | None:
+        """Read-only view of a token and its owner's is_active flag, in one
+        query, shared by concurrent refreshes of it."""
+        if has_pending_writes(self.session):
+            return await self._load_state(token_hash)
+        return await _state_flight.do(token_hash, lambda: self._load_state(token_hash))
+
+    async def _load_state(self, token_hash: bytes) -> RefreshTokenState | None:
+        # read from the primary: the result may be cached as known good, and
+        # a lagging replica may not have seen a revoke or deactivation yet
+        read_at = time.time()
+        stmt = (
+            select(
+                RefreshToken.user_id,
+                RefreshToken.is_revoked,
+                RefreshToken.expires_at,
+                User.is_active,
+            )
+            .outerjoin(User, User.id == RefreshToken.user_id)
+            .where(digest_matches(RefreshToken, token_hash))
+        )
+        res = await self.session.execute(stmt)
+        row = res.one_or_none()
+        return RefreshTokenState(*row, read_at=read_at) if row else None
+
     async def create(self, token: RefreshToken) -> RefreshToken:
         self.session.add(token)
-        await self.session.commit()
-        await self.session.refresh(token)
+        await self.session.flush()
         return token
 
     async def revoke(self, token: RefreshToken) -> None:
         token.is_revoked = True
-        await self.session.commit()
+        await self.session.flush()
+        invalidation_bus.publish(self.session.sync_session, "refresh_tokens", token.user_id)
 
     async def revoke_all_for_user(self, user_id: str) -> None:
         stmt = (
@@ -30,4 +87,4 @@ class RefreshTokenRepository:
             .values(is_revoked=True)
         )
         await self.session.execute(stmt)
-        await self.session.commit()
\ No newline at end of file
+        invalidation_bus.publish(self.session.sync_session, "refresh_tokens", user_id)
@@ -0,0 +1,101 @@
+import datetime as dt
+import itertools
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+from app.models.user import User
+
+settings = get_settings()
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Read-only copy of a user row, safe to share across sessions.
+
+    Deliberately leaves out hashed_password.
+    """
+
+    id: str
+    email: str
+    username: str
+    is_active: bool
+    is_admin: bool
+    created_at: dt.datetime
+    updated_at: dt.datetime
+
+    @classmethod
+    def from_model(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+user_cache: TTLCache[UserSnapshot] = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+
+# A load only caches its row if the user was not evicted while it ran,
+# otherwise a SELECT that started before a commit could put the old row
+# back after the commit's eviction. Evictions are numbered from one clock;
+# loads take a number when they start.
+_clock = itertools.count(1)
+_evicted_at: TTLCache[int] = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+_cleared_at = 0
+
+
+def _evict(user_id: str) -> None:
+    user_cache.pop(user_id)
+    _evicted_at.set(user_id, next(_clock))
+
+
+def _evict_all() -> None:
+    global _cleared_at
+    user_cache.clear()
+    _cleared_at = next(_clock)
+
+
+def load_started() -> int:
+    return next(_clock)
+
+
+def cache_loaded(snapshot: UserSnapshot, started: int) -> None:
+    """Cache a snapshot read by a load that began at started, unless the
+    user was evicted since."""
+    evicted = _evicted_at.get(snapshot.id)
+    if _cleared_at > started or (evicted is not None and evicted > started):
+        return
+    user_cache.set(snapshot.id, snapshot)
+
+
+def invalidate_user(session: Session, user_id: str) -> None:
+    """Evict now, and in every worker once the transaction ends, so a
+    reader that re-cached the old row before our commit cannot keep it."""
+    _evict(user_id)
+    invalidation_bus.publish(session, "user", user_id)
+
+
+def _evict_user(e: InvalidationEvent) -> None:
+    _evict(e.key)
+
+
+invalidation_bus.subscribe("user", _evict_user, resync=_evict_all)
+
+
+def user_cache_stats() -> dict[str, Any]:
+    return user_cache.stats()
@@ -1,7 +1,70 @@
-from sqlalchemy import select
+import datetime as dt
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from sqlalchemy import exists, inspect, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.invalidation import invalidation_bus
+from app.core.singleflight import SingleFlight
+from app.db.session import has_pending_writes, replica_read
 from app.models.user import User
+from app.repositories.user_cache import (
+    UserSnapshot,
+    cache_loaded,
+    invalidate_user,
+    load_started,
+    user_cache,
+)
+
+_snapshot_flight: SingleFlight[UserSnapshot | None] = SingleFlight("user_by_id")
+_credentials_flight: SingleFlight["UserCredentials | None"] = SingleFlight("user_by_email")
+
+
+class UserCredentials(NamedTuple):
+    id: str
+    hashed_password: str
+    is_active: bool
+
+
+def duplicate_field(error: IntegrityError) -> str | None:
+    """Which unique user column an INSERT/UPDATE collided on, if any."""
+    # asyncpg names the constraint; SQLite only says "users.<column>"
+    constraint = getattr(error.orig.__cause__, "constraint_name", None)
+    message = constraint or str(error.orig)
+    for field in ("email", "username"):
+        if f"ix_users_{field}" in message or f"users.{field}" in message:
+            return field
+    return None
+
+
+@dataclass(frozen=True)
+class UserFilters:
+    email: str | None = None  # fragment, case-insensitive
+    username: str | None = None  # fragment, case-insensitive
+    is_active: bool | None = None
+    is_admin: bool | None = None
+    created_from: dt.datetime | None = None
+    created_to: dt.datetime | None = None
+
+    def apply(self, stmt):
+        # fragment matches are served by the pg_trgm GIN indexes on
+        # Postgres; SQLite falls back to a LIKE scan
+        if self.email:
+            stmt = stmt.where(User.email.icontains(self.email, autoescape=True))
+        if self.username:
+            stmt = stmt.where(User.username.icontains(self.username, autoescape=True))
+        if self.is_active is not None:
+            # plain equality so the planner can match the partial indexes
+            stmt = stmt.where(User.is_active == self.is_active)
+        if self.is_admin is not None:
+            stmt = stmt.where(User.is_admin == self.is_admin)
+        if self.created_from is not None:
+            stmt = stmt.where(User.created_at >= self.created_from)
+        if self.created_to is not None:
+            stmt = stmt.where(User.created_at < self.created_to)
+        return stmt
 
 
 class UserRepository:
@@ -13,42 +76,144 @@ class UserRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_snapshot(self, user_id: str) -> UserSnapshot | None:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        # our own uncommitted writes must be neither shared nor cached
+        if has_pending_writes(self.session):
+            user = await self.get_by_id(user_id)
+            return UserSnapshot.from_model(user) if user else None
+
+        return await _snapshot_flight.do(user_id, lambda: self._load_snapshot(user_id))
+
+    async def _load_snapshot(self, user_id: str) -> UserSnapshot | None:
+        # read from the primary: a lagging replica could hand back a row
+        # older than the eviction and it would stay cached for the full TTL
+        started = load_started()
+        user = await self.get_by_id(user_id)
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot.from_model(user)
+        cache_loaded(snapshot, started)
+        return snapshot
+
     async def get_by_email(self, email: str) -> User | None:
         stmt = select(User).where(User.email == email)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_credentials(self, email: str) -> UserCredentials | None:
+        """Just what login needs, shared by concurrent logins for the same email."""
+        if has_pending_writes(self.session):
+            return await self._load_credentials(email)
+        return await _credentials_flight.do(email, lambda: self._load_credentials(email))
+
+    async def _load_credentials(self, email: str) -> UserCredentials | None:
+        stmt = select(User.id, User.hashed_password, User.is_active).where(
+            User.email == email
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return UserCredentials(*row) if row else None
+
     async def get_by_username(self, username: str) -> User | None:
         stmt = select(User).where(User.username == username)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_active_flags(self, user_ids: set[str]) -> dict[str, bool]:
+        flags = {}
+        missing = set()
+        for user_id in user_ids:
+            snapshot = user_cache.get(user_id)
+            if snapshot is not None:
+                flags[user_id] = snapshot.is_active
+            else:
+                missing.add(user_id)
+
+        if missing:
+            stmt = select(User.id, User.is_active).where(User.id.in_(missing))
+            result = await self.session.execute(stmt)
+            flags.update(result.all())
+        return flags
+
+    async def email_exists(self, email: str) -> bool:
+        result = await self.session.execute(select(exists().where(User.email == email)))
+        return result.scalar()
+
+    async def username_exists(self, username: str) -> bool:
+        result = await self.session.execute(
+            select(exists().where(User.username == username))
+        )
+        return result.scalar()
+
     async def create(self, user: User) -> User:
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        invalidation_bus.publish(self.session.sync_session, "email_taken", user.email)
+        invalidation_bus.publish(self.session.sync_session, "username_taken", user.username)
         return user
 
-    async def list_active(self, limit: int = 100, offset: int = 0) -> list[User]:
+    async def replace_password_hash(
+        self,
+        user_id: str,
+        old_hash: str,
+        new_hash: str,
+    ) -> bool:
+        # conditional so a concurrent password change is never overwritten
         stmt = (
-            select(User)
-            .where(User.is_active.is_(True))
-            .limit(limit)
-            .offset(offset)
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        result = await self.session.execute(stmt)
+        invalidate_user(self.session.sync_session, user_id)
+        return result.rowcount == 1
+
+    async def list_active(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: str | None = None,
+    ) -> list[User]:
+        stmt = self._page(
+            select(User).where(User.is_active.is_(True)), limit, offset, after
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    def _page(stmt, limit: int, offset: int, after: str | None):
+        # ULIDs sort by creation time, so seeking on the primary key gives
+        # stable pages that cost the same at any depth
+        if after is not None:
+            stmt = stmt.where(User.id > after)
+        # listings are display-only, so a replica may serve them
+        return replica_read(stmt.order_by(User.id).limit(limit).offset(offset))
+
     async def update(self, user: User) -> User:
-        await self.session.commit()
-        await self.session.refresh(user)
+        username_changed = inspect(user).attrs.username.history.has_changes()
+        await self.session.flush()
+        if username_changed:
+            invalidation_bus.publish(
+                self.session.sync_session, "username_taken", user.username
+            )
+        invalidate_user(self.session.sync_session, user.id)
         return user
 
     async def list_users(
         self,
         limit: int = 50,
         offset: int = 0,
+        after: str | None = None,
+        filters: UserFilters | None = None,
     ) -> list[User]:
-        stmt = select(User).limit(limit).offset(offset)
+        stmt = select(User)
+        if filters is not None:
+            stmt = filters.apply(stmt)
+        stmt = self._page(stmt, limit, offset, after)
         result = await self.session.execute(stmt)
         return result.scalars().all()
@@ -27,4 +27,15 @@ class ForgotPasswordResponse(BaseModel):
 
 class ResetPasswordRequest(BaseModel):
     reset_token: str
-    new_password: str = Field(min_length=8, max_length=128)
\ No newline at end of file
+    new_password: str = Field(min_length=8, max_length=128)
+
+class IntrospectRequest(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=100)
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    user_id: Optional[str] = None
+    token_type: Optional[str] = None
+    exp: Optional[int] = None
+    error: Optional[str] = None
@@ -13,3 +13,8 @@ class ResponseSchema(BaseModel, Generic[T]):
     success: bool
     data: Optional[T] = None
     error: Optional[ErrorSchema] = None
+
+
+class PagedResponseSchema(ResponseSchema[T], Generic[T]):
+    # pass as ?cursor= to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
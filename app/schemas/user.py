@@ -28,6 +28,10 @@ class UserRead(BaseModel):
         "from_attributes": True
     }
 
+class AvailabilityRead(BaseModel):
+    email_available: bool | None = None
+    username_available: bool | None = None
+
 class ChangePasswordRequest(BaseModel):
     current_password: str
     new_password: str = Field(min_length=8, max_length=128)
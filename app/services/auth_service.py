@@ -1,36 +1,95 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from datetime import datetime, timedelta
 from uuid import uuid4
 from app.core.security import (
-    verify_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
      decode_token,
+     decode_token_claims,
+     TokenPayloadError,
        create_access_token,
-       hash_refresh_token,hash_password
+       hash_refresh_token,hash_password_async,
+       PasswordHashingOverloaded,
+       password_needs_rehash,
 )
 from app.repositories.user_repository import UserRepository
-from app.services.errors import InvalidCredentials, InactiveUser,UserNotFound,Unauthorized
+from app.services.errors import InvalidCredentials, InactiveUser,UserNotFound,Unauthorized,ServiceUnavailable,TooManyRequests
 from app.models.refresh_token import RefreshToken
 from app.repositories.refresh_token_repository import RefreshTokenRepository
+from app.repositories.refresh_token_cache import refresh_token_cache
 from app.core.config import get_settings
 from app.repositories.password_reset_token_repository import PasswordResetTokenRepository
 from app.models.password_reset_token import PasswordResetToken
+from app.db.session import AsyncSessionLocal
+from app.db.unit_of_work import UnitOfWork
+from app.core.rate_limit import RateLimitExceeded, get_rate_limiter
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# strong references so pending rehashes are not garbage collected
+_rehash_tasks: set[asyncio.Task] = set()
+
+_introspection_cache: TTLCache[dict] = TTLCache(
+    maxsize=get_settings().introspection_cache_size,
+    ttl=get_settings().introspection_cache_ttl_seconds,
+)
+
+
+def introspection_cache_stats() -> dict:
+    return _introspection_cache.stats()
 
 
 class AuthService:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
         self.session = session
+        self.session_factory = session_factory
         self.repo = UserRepository(session)
 
-    async def login(self, email: str, password: str) -> dict:
-        user = await self.repo.get_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+    def _check_rate_limit(self, action: str, email: str, client_ip: str | None) -> None:
+        # runs before any DB or argon2 work so rejected attempts stay cheap
+        try:
+            get_rate_limiter(f"{action}:email").hit(email.lower())
+            if client_ip:
+                get_rate_limiter(f"{action}:ip").hit(client_ip)
+        except RateLimitExceeded as e:
+            raise TooManyRequests(retry_after=e.retry_after)
+
+    async def login(
+        self,
+        email: str,
+        password: str,
+        client_ip: str | None = None,
+    ) -> dict:
+        self._check_rate_limit("login", email, client_ip)
+
+        user = await self.repo.get_credentials(email)
+        if not user:
+            raise InvalidCredentials()
+
+        try:
+            valid = await verify_password_async(password, user.hashed_password)
+        except PasswordHashingOverloaded as e:
+            raise ServiceUnavailable(retry_after=e.retry_after)
+
+        if not valid:
             raise InvalidCredentials()
 
         if not user.is_active:
             raise InactiveUser()
 
+        if password_needs_rehash(user.hashed_password):
+            self._schedule_rehash(user.id, user.hashed_password, password)
+
         access_token = create_access_token(user.id)
         refresh_token = create_refresh_token(user.id)
         settings = get_settings()
@@ -47,7 +106,7 @@ class AuthService:
         token_record = RefreshToken(
             id=str(uuid4()),
             user_id=user.id,
-            token_hash=token_hash,
+            token_digest=token_hash,
             expires_at=expires_at,
         )
 
@@ -60,40 +119,120 @@ class AuthService:
         }
 
 
+    def _schedule_rehash(self, user_id: str, old_hash: str, password: str) -> None:
+        task = asyncio.create_task(self._rehash_password(user_id, old_hash, password))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+
+    async def _rehash_password(self, user_id: str, old_hash: str, password: str) -> None:
+        # runs after the response on its own session; failures only cost a retry next login
+        try:
+            new_hash = await hash_password_async(password)
+            async with self.session_factory() as session, UnitOfWork(session):
+                await UserRepository(session).replace_password_hash(
+                    user_id, old_hash, new_hash
+                )
+        except Exception:
+            logger.warning("Background rehash failed for user %s", user_id, exc_info=True)
+
     async def refresh_access_token(self, refresh_token: str) -> dict:
         # 1. decode + validate token type
         user_id = decode_token(refresh_token, expected_type="refresh")
 
-        # 2. lookup refresh token in DB
+        # 2. answer from what earlier refreshes learned, if still fresh
         token_hash = hash_refresh_token(refresh_token)
+        if refresh_token_cache.is_revoked(token_hash):
+            raise Unauthorized("Refresh token revoked")
+        if refresh_token_cache.is_inactive(user_id):
+            raise InactiveUser()
+        if refresh_token_cache.is_known_good(token_hash, user_id):
+            return {"access_token": create_access_token(user_id)}
+
+        # 3. lookup refresh token and its user in DB
         repo = RefreshTokenRepository(self.session)
 
-        token_record = await repo.get_by_hash(token_hash)
+        token_record = await repo.get_state_by_hash(token_hash)
 
         if not token_record:
             raise Unauthorized("Invalid refresh token")
 
         if token_record.is_revoked:
+            refresh_token_cache.mark_revoked(token_hash, token_record.expires_at)
             raise Unauthorized("Refresh token revoked")
 
         if token_record.expires_at < datetime.utcnow():
             raise Unauthorized("Refresh token expired")
 
-        # 3. ensure user still valid
-        user = await self.repo.get_by_id(user_id)
-        if not user:
+        # ensure user still valid (joined into the same query)
+        if token_record.user_is_active is None:
             raise UserNotFound()
 
-        if not user.is_active:
+        if not token_record.user_is_active:
+            refresh_token_cache.mark_inactive(user_id)
             raise InactiveUser()
 
+        refresh_token_cache.mark_good(
+            token_hash, user_id, token_record.expires_at, token_record.read_at
+        )
+
         # 4. issue new access token
         return {
-            "access_token": create_access_token(user.id),
+            "access_token": create_access_token(user_id),
         }
 
 
 
+    async def introspect(self, tokens: list[str]) -> list[dict]:
+        results: list[dict | None] = [None] * len(tokens)
+        pending: dict[int, tuple[str, str, int | None]] = {}
+
+        for i, token in enumerate(tokens):
+            cached = _introspection_cache.get(token)
+            if cached is not None:
+                results[i] = cached
+                continue
+
+            try:
+                user_id, token_type, exp = decode_token_claims(token)
+            except TokenPayloadError as e:
+                results[i] = {"active": False, "error": str(e)}
+                continue
+
+            if token_type != "access" or not user_id:
+                results[i] = {"active": False, "error": "Invalid token type"}
+                continue
+
+            pending[i] = (user_id, token_type, exp)
+
+        # one query for every distinct user in the batch
+        active_flags = await self.repo.get_active_flags(
+            {user_id for user_id, _, _ in pending.values()}
+        )
+
+        for i, (user_id, token_type, exp) in pending.items():
+            if user_id not in active_flags:
+                error = UserNotFound.message
+            elif not active_flags[user_id]:
+                error = InactiveUser.message
+            else:
+                error = None
+
+            result = {
+                "active": error is None,
+                "user_id": user_id,
+                "token_type": token_type,
+                "exp": exp,
+                "error": error,
+            }
+            # never report a token as active past its own expiry
+            expires_at = time.time() + _introspection_cache.ttl
+            if exp is not None:
+                expires_at = min(expires_at, exp)
+            _introspection_cache.set(tokens[i], result, expires_at=expires_at)
+            results[i] = result
+
+        return results
+
     async def logout(self, refresh_token: str) -> None:
         token_hash = hash_refresh_token(refresh_token)
         repo = RefreshTokenRepository(self.session)
@@ -106,10 +245,15 @@ class AuthService:
         if token_record.is_revoked:
             return  # idempotent logout
 
-        token_record.is_revoked = True
-        await self.session.commit()
+        await repo.revoke(token_record)
+
+    async def forgot_password(
+        self,
+        email: str,
+        client_ip: str | None = None,
+    ) -> str | None:
+        self._check_rate_limit("forgot_password", email, client_ip)
 
-    async def forgot_password(self, email: str) -> str | None:
         user = await self.repo.get_by_email(email)
 
         # Always return success to avoid user enumeration
@@ -129,7 +273,7 @@ class AuthService:
         token_record = PasswordResetToken(
             id=str(uuid4()),
             user_id=user.id,
-            token_hash=token_hash,
+            token_digest=token_hash,
             expires_at=expires_at,
         )
 
@@ -157,7 +301,11 @@ class AuthService:
             raise Unauthorized("Invalid reset token")
 
         # update password
-        user.hashed_password = hash_password(new_password)
+        try:
+            user.hashed_password = await hash_password_async(new_password)
+        except PasswordHashingOverloaded as e:
+            raise ServiceUnavailable(retry_after=e.retry_after)
+        await self.repo.update(user)
 
         # invalidate all refresh tokens
         refresh_repo = RefreshTokenRepository(self.session)
@@ -166,4 +314,4 @@ class AuthService:
         # mark reset token used
         token_record.used = True
 
-        await self.session.commit()
+        await self.session.flush()
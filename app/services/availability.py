@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.bloom import BloomFilter
+from app.core.config import get_settings
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class AvailabilityIndex:
+    """Bloom filters of every email and username in use.
+
+    A miss means the value is definitely free and needs no query; a hit
+    only means it may be taken. Until the startup scan has finished every
+    value counts as possibly taken.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.filters = {
+            "email": BloomFilter(capacity, error_rate),
+            "username": BloomFilter(capacity, error_rate),
+        }
+        self.ready = False
+        self.definitely_free = 0
+        self.maybe_taken = 0
+
+    def add(self, field: str, value: str) -> None:
+        self.filters[field].add(value)
+
+    def may_be_taken(self, field: str, value: str) -> bool:
+        if self.ready and value not in self.filters[field]:
+            self.definitely_free += 1
+            return False
+        self.maybe_taken += 1
+        return True
+
+    async def load(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        batch_size: int = 5_000,
+    ) -> None:
+        # writes committed meanwhile arrive as events, so filling the live
+        # filters while scanning cannot miss anything
+        async with session_factory() as session:
+            result = await session.stream(
+                select(User.email, User.username).execution_options(
+                    yield_per=batch_size
+                )
+            )
+            async for email, username in result:
+                self.add("email", email)
+                self.add("username", username)
+        self.ready = True
+
+    async def reload(self, session_factory: async_sessionmaker = AsyncSessionLocal) -> None:
+        self.ready = False
+        try:
+            await self.load(session_factory)
+        except Exception:
+            logger.exception("Loading the availability index failed")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "definitely_free": self.definitely_free,
+            "maybe_taken": self.maybe_taken,
+            **{field: f.stats() for field, f in self.filters.items()},
+        }
+
+
+availability_index = AvailabilityIndex(
+    settings.availability_filter_capacity,
+    settings.availability_filter_error_rate,
+)
+
+# strong reference to a reload started by a listener reconnect
+_reload_tasks: set[asyncio.Task] = set()
+
+
+def _on_taken(field: str):
+    def handler(e: InvalidationEvent) -> None:
+        availability_index.add(field, e.key)
+
+    return handler
+
+
+def _reload_after_gap() -> None:
+    # events sent while the listener was disconnected are lost
+    if not availability_index.ready:
+        return
+    task = asyncio.get_running_loop().create_task(availability_index.reload())
+    _reload_tasks.add(task)
+    task.add_done_callback(_reload_tasks.discard)
+
+
+invalidation_bus.subscribe("email_taken", _on_taken("email"))
+invalidation_bus.subscribe("username_taken", _on_taken("username"), resync=_reload_after_gap)
@@ -1,6 +1,8 @@
 class ServiceError(Exception):
     code: str
     message: str
+    status_code: int = 400
+    retry_after: int | None = None
 
     def __init__(self, message: str | None = None):
         if message:
@@ -31,3 +33,28 @@ class UserNotFound(ServiceError):
 class InactiveUser(ServiceError):
     code = "USER_INACTIVE"
     message = "User account is inactive"
+
+
+class ServiceUnavailable(ServiceError):
+    code = "SERVICE_UNAVAILABLE"
+    message = "Service temporarily overloaded, please retry"
+    status_code = 503
+
+    def __init__(self, message: str | None = None, retry_after: int | None = None):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class TooManyRequests(ServiceError):
+    code = "TOO_MANY_REQUESTS"
+    message = "Too many attempts, please retry later"
+    status_code = 429
+
+    def __init__(self, message: str | None = None, retry_after: int | None = None):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class InvalidCursor(ServiceError):
+    code = "INVALID_CURSOR"
+    message = "Invalid pagination cursor"
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import ColumnElement, delete, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.models.password_reset_token import PasswordResetToken
+from app.models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeResult:
+    table: str
+    deleted: int
+    batches: int
+    seconds: float
+
+
+class TokenPurger:
+    """Deletes refresh and password reset tokens nobody can use any more.
+
+    Rows are removed in small batches walked in primary key order, each in
+    its own short transaction, with a pause in between so the hot tables
+    never see long locks. Tokens are kept for grace_seconds after they
+    expired, were revoked or were used.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        batch_size: int = 1_000,
+        pause_seconds: float = 0.1,
+        grace_seconds: float = 86_400,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.grace_seconds = grace_seconds
+        self.runs = 0
+        self.deleted_total = 0
+        self.last_run: list[PurgeResult] = []
+
+    @classmethod
+    def from_settings(cls) -> "TokenPurger":
+        settings = get_settings()
+        return cls(
+            batch_size=settings.token_purge_batch_size,
+            pause_seconds=settings.token_purge_pause_seconds,
+            grace_seconds=settings.token_purge_grace_seconds,
+        )
+
+    def _conditions(self) -> dict[type, ColumnElement[bool]]:
+        # token timestamps are stored as naive UTC
+        cutoff = datetime.utcnow() - timedelta(seconds=self.grace_seconds)
+        return {
+            RefreshToken: or_(
+                RefreshToken.expires_at < cutoff,
+                RefreshToken.is_revoked.is_(True) & (RefreshToken.created_at < cutoff),
+            ),
+            PasswordResetToken: or_(
+                PasswordResetToken.expires_at < cutoff,
+                PasswordResetToken.used.is_(True)
+                & (PasswordResetToken.created_at < cutoff),
+            ),
+        }
+
+    async def _purge(self, model: type, condition: ColumnElement[bool]) -> PurgeResult:
+        started = time.perf_counter()
+        deleted = batches = 0
+        last_id = ""
+
+        while True:
+            async with self.session_factory() as session, session.begin():
+                # rows another transaction holds are left for the next run
+                ids = (
+                    await session.scalars(
+                        select(model.id)
+                        .where(condition, model.id > last_id)
+                        .order_by(model.id)
+                        .limit(self.batch_size)
+                        .with_for_update(skip_locked=True)
+                    )
+                ).all()
+                if not ids:
+                    break
+
+                result = await session.execute(delete(model).where(model.id.in_(ids)))
+
+            deleted += result.rowcount
+            batches += 1
+            last_id = ids[-1]
+            if len(ids) < self.batch_size:
+                break
+            await asyncio.sleep(self.pause_seconds)
+
+        return PurgeResult(
+            table=model.__tablename__,
+            deleted=deleted,
+            batches=batches,
+            seconds=time.perf_counter() - started,
+        )
+
+    async def run(self) -> list[PurgeResult]:
+        results = [
+            await self._purge(model, condition)
+            for model, condition in self._conditions().items()
+        ]
+
+        self.runs += 1
+        self.deleted_total += sum(r.deleted for r in results)
+        self.last_run = results
+        for r in results:
+            logger.info(
+                "Purged %d rows from %s in %d batches (%.2fs)",
+                r.deleted,
+                r.table,
+                r.batches,
+                r.seconds,
+            )
+        return results
+
+    async def run_forever(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception:
+                logger.exception("Token purge failed")
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "deleted_total": self.deleted_total,
+            "last_run": [asdict(r) for r in self.last_run],
+        }
+
+
+token_purger = TokenPurger.from_settings()
@@ -1,10 +1,13 @@
 import ulid
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.repositories.user_repository import UserRepository
-from app.core.security import hash_password,verify_password
-from app.services.errors import UserAlreadyExists, UserNotFound,InvalidCredentials
+from app.repositories.user_cache import UserSnapshot
+from app.repositories.user_repository import UserRepository, duplicate_field
+from app.services.availability import availability_index
+from app.core.security import hash_password_async,verify_password_async,PasswordHashingOverloaded
+from app.services.errors import UserAlreadyExists, UserNotFound,InvalidCredentials,ServiceUnavailable
 
 
 
@@ -18,23 +21,58 @@ class UserService:
         username: str,
         password: str,
     ) -> User:
-        if await self.repo.get_by_email(email):
-            raise UserAlreadyExists("Email already registered")
-
-        if await self.repo.get_by_username(username):
-            raise UserAlreadyExists("Username already taken")
+        try:
+            hashed_password = await hash_password_async(password)
+        except PasswordHashingOverloaded as e:
+            raise ServiceUnavailable(retry_after=e.retry_after)
 
         user = User(
             id=str(ulid.ULID()),   # ✅ CORRECT
             email=email,
             username=username,
-            hashed_password=hash_password(password),
+            hashed_password=hashed_password,
         )
 
-        return await self.repo.create(user)
+        # the unique indexes decide; no racy pre-check SELECTs
+        try:
+            return await self.repo.create(user)
+        except IntegrityError as e:
+            self._raise_if_duplicate(e)
+            raise
+
+    @staticmethod
+    def _raise_if_duplicate(error: IntegrityError) -> None:
+        field = duplicate_field(error)
+        if field == "email":
+            raise UserAlreadyExists("Email already registered")
+        if field == "username":
+            raise UserAlreadyExists("Username already taken")
 
-    async def get_user(self, user_id: str) -> User:
-        user = await self.repo.get_by_id(user_id)
+    async def email_taken(self, email: str) -> bool:
+        # a Bloom filter miss is definitive; only possible hits hit the index
+        if not availability_index.may_be_taken("email", email):
+            return False
+        return await self.repo.email_exists(email)
+
+    async def username_taken(self, username: str) -> bool:
+        if not availability_index.may_be_taken("username", username):
+            return False
+        return await self.repo.username_exists(username)
+
+    async def check_availability(
+        self,
+        email: str | None,
+        username: str | None,
+    ) -> dict[str, bool | None]:
+        return {
+            "email_available": not await self.email_taken(email) if email else None,
+            "username_available": (
+                not await self.username_taken(username) if username else None
+            ),
+        }
+
+    async def get_user(self, user_id: str) -> UserSnapshot:
+        user = await self.repo.get_snapshot(user_id)
         if not user:
             raise UserNotFound()
         return user
@@ -54,12 +92,13 @@ class UserService:
             raise UserNotFound()
 
         if username:
-            if await self.repo.get_by_username(username):
-                raise UserAlreadyExists("Username already taken")
-
             user.username = username
 
-        return await self.repo.update(user)
+        try:
+            return await self.repo.update(user)
+        except IntegrityError as e:
+            self._raise_if_duplicate(e)
+            raise
 
 
 
@@ -73,10 +112,13 @@ class UserService:
         if not user:
             raise UserNotFound()
 
-        if not verify_password(current_password, user.hashed_password):
-            raise InvalidCredentials("Current password is incorrect")
+        try:
+            if not await verify_password_async(current_password, user.hashed_password):
+                raise InvalidCredentials("Current password is incorrect")
 
-        user.hashed_password = hash_password(new_password)
+            user.hashed_password = await hash_password_async(new_password)
+        except PasswordHashingOverloaded as e:
+            raise ServiceUnavailable(retry_after=e.retry_after)
         await self.repo.update(user)
 
 
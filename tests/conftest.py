@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import (
 from app.main import create_app
 from app.db.base import Base
 from app.api.deps import db_session_dep
+from app.core.security import shutdown_hash_executor
 from httpx import AsyncClient, ASGITransport
 import uuid
 
@@ -58,6 +59,8 @@ async def app() -> FastAPI:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+    shutdown_hash_executor()
+
 
 # ---------- http client ----------
 @pytest.fixture
@@ -112,6 +115,13 @@ async def access_token(client, create_user):
 async def auth_header(access_token):
     return {"Authorization": f"Bearer {access_token}"}
 
+@pytest.fixture
+def service_header(monkeypatch):
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "introspection_service_keys", "old-key,svc-key")
+    return {"X-Service-Key": "svc-key"}
+
 from app.repositories.user_repository import UserRepository
 
 @pytest.fixture
@@ -127,6 +137,7 @@ async def admin_auth_header(client, db_session):
     user = await repo.get_by_id(user_id)
     user.is_admin = True
     await repo.update(user)
+    await db_session.commit()
 
     # login
     login = await client.post(
@@ -24,3 +24,126 @@ async def test_admin_can_list_users(client, admin_auth_header):
     assert body["success"] is True
     assert isinstance(body["data"], list)
     assert len(body["data"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_admin_can_read_metrics(client, admin_auth_header):
+    response = await client.get(
+        "/api/v1/admin/metrics",
+        headers=admin_auth_header,
+    )
+
+    assert response.status_code == 200
+    assert "password_hashing" in response.json()["data"]
+
+
+@pytest.mark.asyncio
+async def test_deactivation_invalidates_cached_user(
+    client, admin_auth_header, create_user
+):
+    payload, user = await create_user()
+    login = await client.post(
+        "/api/v1/auth/login",
+        json={"email": payload["email"], "password": payload["password"]},
+    )
+    refresh_token = login.json()["data"]["refresh_token"]
+
+    # warm the cache with the active user
+    refresh = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+    )
+    assert refresh.status_code == 200
+
+    await client.patch(
+        f"/api/v1/admin/users/{user['id']}/deactivate",
+        headers=admin_auth_header,
+    )
+    refresh = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+    )
+
+    assert refresh.status_code != 200
+
+
+@pytest.mark.asyncio
+async def test_admin_user_listing_pages_with_cursor(
+    client, admin_auth_header, create_user
+):
+    for _ in range(3):
+        await create_user()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(
+            "/api/v1/admin/users", params=params, headers=admin_auth_header
+        )
+        assert response.status_code == 200
+        body = response.json()
+        seen += [u["id"] for u in body["data"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) >= 4
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.asyncio
+async def test_admin_user_listing_rejects_bad_cursor(client, admin_auth_header):
+    response = await client.get(
+        "/api/v1/admin/users",
+        params={"cursor": "not-a-cursor"},
+        headers=admin_auth_header,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+@pytest.mark.asyncio
+async def test_admin_user_listing_filters(client, admin_auth_header, create_user):
+    payload, user = await create_user()
+    fragment = payload["username"][-6:].upper()
+
+    response = await client.get(
+        "/api/v1/admin/users",
+        params={"username": fragment, "is_active": True, "is_admin": False},
+        headers=admin_auth_header,
+    )
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()["data"]] == [user["id"]]
+
+    response = await client.get(
+        "/api/v1/admin/users",
+        params={"email": payload["email"], "created_to": "2000-01-01T00:00:00Z"},
+        headers=admin_auth_header,
+    )
+    assert response.json()["data"] == []
+
+    response = await client.get(
+        "/api/v1/admin/users",
+        params={"email": payload["email"], "created_from": "2000-01-01T00:00:00Z"},
+        headers=admin_auth_header,
+    )
+    assert [u["id"] for u in response.json()["data"]] == [user["id"]]
+
+    response = await client.get(
+        "/api/v1/admin/users",
+        params={"is_admin": True},
+        headers=admin_auth_header,
+    )
+    assert user["id"] not in [u["id"] for u in response.json()["data"]]
+
+
+@pytest.mark.asyncio
+async def test_admin_user_search_needs_a_trigram(client, admin_auth_header):
+    response = await client.get(
+        "/api/v1/admin/users",
+        params={"email": "ab"},
+        headers=admin_auth_header,
+    )
+
+    assert response.status_code == 422
@@ -183,3 +183,212 @@ async def test_reset_password_token_cannot_be_reused(client, create_user):
     )
 
     assert second.status_code == 401
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password_hash(create_user, db_session):
+    import asyncio
+
+    from app.core.security import pwd_context, password_needs_rehash
+    from app.repositories.user_repository import UserRepository
+    from app.services import auth_service
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.services.auth_service import AuthService
+
+    payload, data = await create_user()
+
+    # store a hash made with weaker parameters than the configured ones
+    repo = UserRepository(db_session)
+    user = await repo.get_by_id(data["id"])
+    user.hashed_password = (
+        pwd_context.handler("argon2").using(time_cost=1).hash(payload["password"])
+    )
+    await repo.update(user)
+    await db_session.commit()
+    assert password_needs_rehash(user.hashed_password)
+
+    service = AuthService(
+        db_session,
+        session_factory=async_sessionmaker(bind=db_session.bind),
+    )
+    await service.login(payload["email"], payload["password"])
+    await asyncio.gather(*auth_service._rehash_tasks)
+
+    await db_session.refresh(user)
+    assert not password_needs_rehash(user.hashed_password)
+
+@pytest.mark.asyncio
+async def test_login_is_rate_limited_per_email(client, create_user):
+    payload, _ = await create_user()
+
+    for _ in range(5):
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": payload["email"], "password": "wrongpassword"},
+        )
+        assert response.status_code == 400
+
+    # even the right password is rejected until the bucket refills
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": payload["email"], "password": payload["password"]},
+    )
+
+    assert response.status_code == 429
+    assert response.json()["error"]["code"] == "TOO_MANY_REQUESTS"
+    assert int(response.headers["Retry-After"]) >= 1
+
+@pytest.mark.asyncio
+async def test_introspect_requires_a_service_key(client, access_token, service_header):
+    body = {"tokens": [access_token]}
+
+    missing = await client.post("/api/v1/auth/introspect", json=body)
+    wrong = await client.post(
+        "/api/v1/auth/introspect", json=body, headers={"X-Service-Key": "guess"}
+    )
+
+    assert missing.status_code == 403
+    assert wrong.status_code == 403
+    assert missing.json()["error"]["code"] == "FORBIDDEN"
+
+
+@pytest.mark.asyncio
+async def test_introspect_reports_each_token(client, access_token, service_header):
+    response = await client.post(
+        "/api/v1/auth/introspect",
+        json={"tokens": [access_token, "not-a-jwt", access_token]},
+        headers=service_header,
+    )
+
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert len(results) == 3
+
+    assert results[0]["active"] is True
+    assert results[0]["user_id"]
+    assert results[0]["token_type"] == "access"
+    assert results[2] == results[0]
+
+    assert results[1]["active"] is False
+    assert results[1]["error"] == "Invalid token"
+
+
+@pytest.mark.asyncio
+async def test_introspect_rejects_refresh_tokens(client, create_user, service_header):
+    payload, _ = await create_user()
+    login = await client.post(
+        "/api/v1/auth/login",
+        json={"email": payload["email"], "password": payload["password"]},
+    )
+
+    response = await client.post(
+        "/api/v1/auth/introspect",
+        json={"tokens": [login.json()["data"]["refresh_token"]]},
+        headers=service_header,
+    )
+
+    assert response.json()["data"][0]["active"] is False
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_revalidated_only_after_changes(client, create_user):
+    from app.repositories.refresh_token_cache import refresh_token_cache
+
+    payload, _ = await create_user()
+    login = await client.post(
+        "/api/v1/auth/login",
+        json={"email": payload["email"], "password": payload["password"]},
+    )
+    body = {"refresh_token": login.json()["data"]["refresh_token"]}
+
+    revalidations = refresh_token_cache.revalidations
+    for _ in range(3):
+        refresh = await client.post("/api/v1/auth/refresh", json=body)
+        assert refresh.status_code == 200
+    assert refresh_token_cache.revalidations == revalidations + 1
+
+    await client.post("/api/v1/auth/logout", json=body)
+
+    for _ in range(2):
+        refresh = await client.post("/api/v1/auth/refresh", json=body)
+        assert refresh.status_code == 401
+    assert refresh_token_cache.revoked.hits >= 1
+
+
+@pytest.mark.asyncio
+async def test_tokens_stored_as_hex_before_digest_migration_still_work(
+    client, db_session, create_user
+):
+    import hashlib
+    from datetime import datetime, timedelta
+    from uuid import uuid4
+
+    from app.core.security import create_refresh_token
+    from app.models.refresh_token import RefreshToken
+
+    _, user = await create_user()
+    refresh_token = create_refresh_token(user["id"])
+    db_session.add(
+        RefreshToken(
+            id=str(uuid4()),
+            user_id=user["id"],
+            token_hash=hashlib.sha256(refresh_token.encode()).hexdigest(),
+            expires_at=datetime.utcnow() + timedelta(days=1),
+        )
+    )
+    await db_session.commit()
+
+    body = {"refresh_token": refresh_token}
+    refresh = await client.post("/api/v1/auth/refresh", json=body)
+    assert refresh.status_code == 200
+
+    logout = await client.post("/api/v1/auth/logout", json=body)
+    assert logout.status_code == 200
+    refresh = await client.post("/api/v1/auth/refresh", json=body)
+    assert refresh.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_joining_a_read_started_before_revoke_is_not_trusted(
+    client, create_user, monkeypatch
+):
+    import asyncio
+
+    from app.repositories import refresh_token_repository
+    from app.repositories.refresh_token_repository import RefreshTokenRepository
+
+    payload, _ = await create_user()
+    login = await client.post(
+        "/api/v1/auth/login",
+        json={"email": payload["email"], "password": payload["password"]},
+    )
+    body = {"refresh_token": login.json()["data"]["refresh_token"]}
+
+    # hold the leading read open after it has seen the unrevoked row
+    read_done, release = asyncio.Event(), asyncio.Event()
+    load_state = RefreshTokenRepository._load_state
+
+    async def slow_load_state(self, token_hash):
+        state = await load_state(self, token_hash)
+        read_done.set()
+        await release.wait()
+        return state
+
+    monkeypatch.setattr(RefreshTokenRepository, "_load_state", slow_load_state)
+    flight = refresh_token_repository._state_flight
+
+    leader = asyncio.create_task(client.post("/api/v1/auth/refresh", json=body))
+    await read_done.wait()
+    logout = await client.post("/api/v1/auth/logout", json=body)
+    assert logout.status_code == 200
+
+    coalesced = flight.coalesced
+    follower = asyncio.create_task(client.post("/api/v1/auth/refresh", json=body))
+    while flight.coalesced == coalesced:
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(leader, follower)
+
+    monkeypatch.setattr(RefreshTokenRepository, "_load_state", load_state)
+    refresh = await client.post("/api/v1/auth/refresh", json=body)
+    assert refresh.status_code == 401
@@ -0,0 +1,64 @@
+import pytest
+
+from app.core.bloom import BloomFilter
+from app.services.availability import AvailabilityIndex, availability_index
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    items = [f"user_{i}@example.com" for i in range(1_000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other_{i}@example.com" in bloom for i in range(1_000))
+    assert false_positives < 50
+
+
+@pytest.mark.asyncio
+async def test_index_loads_existing_users(db_session, create_user):
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    payload, _ = await create_user()
+    index = AvailabilityIndex(capacity=1_000, error_rate=0.01)
+
+    assert index.may_be_taken("email", "nobody@example.com")  # not loaded yet
+
+    await index.load(async_sessionmaker(bind=db_session.bind))
+
+    assert index.may_be_taken("email", payload["email"])
+    assert index.may_be_taken("username", payload["username"])
+    assert not index.may_be_taken("username", "definitely_nobody")
+
+
+@pytest.mark.asyncio
+async def test_availability_endpoint(client, create_user):
+    payload, _ = await create_user()
+
+    response = await client.get(
+        "/api/v1/users/availability",
+        params={"email": payload["email"], "username": "free_name_123"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {
+        "email_available": False,
+        "username_available": True,
+    }
+
+
+@pytest.mark.asyncio
+async def test_registration_updates_loaded_index(client, db_session, create_user):
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    await availability_index.load(async_sessionmaker(bind=db_session.bind))
+    payload, _ = await create_user()
+
+    assert availability_index.may_be_taken("email", payload["email"])
+    assert availability_index.may_be_taken("username", payload["username"])
+
+    response = await client.get(
+        "/api/v1/users/availability", params={"username": payload["username"]}
+    )
+    assert response.json()["data"]["username_available"] is False
+
@@ -0,0 +1,348 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.db.session import InstrumentedQueuePool, engine_options, pool_stats
+
+
+def test_engine_options_apply_pool_settings_for_postgres():
+    settings = get_settings().model_copy(
+        update={
+            "database_url": "postgresql+asyncpg://u:p@db/app",
+            "db_pool_size": 20,
+            "db_pgbouncer_mode": True,
+        }
+    )
+
+    options = engine_options(settings)
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["statement_cache_size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_report_checkouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert pool_stats(engine)["checked_out"] == 1
+
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["checkout_wait_seconds_total"] >= 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_routing_session_reads_replica_only_when_asked(tmp_path):
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.db.base import Base
+    from app.db.session import ReplicaSet, RoutingSession, replica_read
+    from app.models.user import User
+
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for target in (primary, replica):
+        async with target.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # a row only the replica has tells us where a read was served
+    async with replica.begin() as conn:
+        await conn.execute(
+            User.__table__.insert().values(
+                id="replica-only",
+                email="replica@example.com",
+                username="replica",
+                hashed_password="x",
+                is_active=True,
+            )
+        )
+
+    Session = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=primary.sync_engine,
+        replicas=ReplicaSet([replica]),
+        expire_on_commit=False,
+    )
+    try:
+        async with Session() as session:
+            # reads that may feed a write stay on the primary
+            assert await session.get(User, "replica-only") is None
+            only_replica = replica_read(select(User.id))
+            assert (await session.execute(only_replica)).scalars().all() == [
+                "replica-only"
+            ]
+
+            session.add(
+                User(
+                    id="primary-user",
+                    email="primary@example.com",
+                    username="primary",
+                    hashed_password="x",
+                )
+            )
+            await session.flush()
+
+            # after the write, even opted-in reads stick to the primary
+            ids = (await session.execute(only_replica)).scalars().all()
+            assert ids == ["primary-user"]
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_user_cache_is_filled_from_the_primary(tmp_path):
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.db.base import Base
+    from app.db.session import ReplicaSet, RoutingSession
+    from app.models.user import User
+    from app.repositories.user_cache import user_cache
+    from app.repositories.user_repository import UserRepository
+
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    # the replica has not seen the deactivation yet
+    for target, is_active in ((primary, False), (replica, True)):
+        async with target.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                User.__table__.insert().values(
+                    id="lagging-user",
+                    email="lagging@example.com",
+                    username="lagging",
+                    hashed_password="x",
+                    is_active=is_active,
+                )
+            )
+
+    Session = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=primary.sync_engine,
+        replicas=ReplicaSet([replica]),
+        expire_on_commit=False,
+    )
+    try:
+        async with Session() as session:
+            snapshot = await UserRepository(session).get_snapshot("lagging-user")
+        assert snapshot.is_active is False
+        assert user_cache.get("lagging-user").is_active is False
+    finally:
+        user_cache.pop("lagging-user")
+        await primary.dispose()
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_state_is_read_from_the_primary(tmp_path):
+    from datetime import datetime, timedelta
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.db.base import Base
+    from app.db.session import ReplicaSet, RoutingSession
+    from app.models.refresh_token import RefreshToken
+    from app.models.user import User
+    from app.repositories.refresh_token_repository import RefreshTokenRepository
+
+    digest = bytes(32)
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    # the replica has not seen the logout yet
+    for target, is_revoked in ((primary, True), (replica, False)):
+        async with target.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                User.__table__.insert().values(
+                    id="token-owner",
+                    email="owner@example.com",
+                    username="owner",
+                    hashed_password="x",
+                )
+            )
+            await conn.execute(
+                RefreshToken.__table__.insert().values(
+                    id="token",
+                    user_id="token-owner",
+                    token_digest=digest,
+                    is_revoked=is_revoked,
+                    expires_at=datetime.utcnow() + timedelta(days=1),
+                )
+            )
+
+    Session = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=primary.sync_engine,
+        replicas=ReplicaSet([replica]),
+        expire_on_commit=False,
+    )
+    try:
+        async with Session() as session:
+            state = await RefreshTokenRepository(session).get_state_by_hash(digest)
+        assert state.is_revoked is True
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_set_skips_unhealthy_replicas(tmp_path):
+    from app.db.session import ReplicaSet
+
+    good = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'good.db'}")
+    bad = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'bad.db'}")
+    replicas = ReplicaSet([good, bad])
+    try:
+        await replicas.check_health()
+
+        assert replicas.healthy == {good}
+        assert {replicas.choose() for _ in range(4)} == {good.sync_engine}
+    finally:
+        await replicas.dispose()
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_login_once(create_user, db_session):
+    from app.db.unit_of_work import UnitOfWork
+    from app.services.auth_service import AuthService
+
+    payload, _ = await create_user()
+
+    async with UnitOfWork(db_session) as uow:
+        await AuthService(db_session).login(payload["email"], payload["password"])
+
+    # SELECT user, INSERT refresh token, COMMIT
+    assert uow.commits == 1
+    assert uow.round_trips == 3
+
+
+@pytest.mark.asyncio
+async def test_refresh_validates_token_and_user_in_one_query(create_user, db_session):
+    from app.db.unit_of_work import UnitOfWork
+    from app.services.auth_service import AuthService
+
+    payload, _ = await create_user()
+    async with UnitOfWork(db_session):
+        tokens = await AuthService(db_session).login(
+            payload["email"], payload["password"]
+        )
+
+    async with UnitOfWork(db_session) as uow:
+        await AuthService(db_session).refresh_access_token(tokens["refresh_token"])
+
+    # SELECT refresh token JOIN user, COMMIT
+    assert uow.statements == 1
+
+
+@pytest.mark.asyncio
+async def test_registration_reads_server_defaults_without_extra_select(db_session):
+    from app.db.unit_of_work import UnitOfWork
+    from app.services.user_service import UserService
+    from conftest import user_payload
+
+    async with UnitOfWork(db_session) as uow:
+        user = await UserService(db_session).register_user(**user_payload())
+
+    # INSERT ... RETURNING, COMMIT
+    assert uow.round_trips == 2
+    assert user.created_at is not None
+    assert user.updated_at is not None
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_service_error(db_session):
+    from app.db.unit_of_work import UnitOfWork
+    from app.repositories.user_repository import UserRepository
+    from app.services.errors import UserAlreadyExists
+    from app.services.user_service import UserService
+    from conftest import user_payload
+
+    payload = user_payload()
+
+    with pytest.raises(UserAlreadyExists):
+        async with UnitOfWork(db_session) as uow:
+            await UserService(db_session).register_user(**payload)
+            raise UserAlreadyExists()
+
+    assert uow.rollbacks == 1
+    assert await UserRepository(db_session).get_by_email(payload["email"]) is None
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_stops_counting_after_exit(db_session):
+    from sqlalchemy import text
+
+    from app.db.unit_of_work import UnitOfWork
+
+    async with UnitOfWork(db_session) as uow:
+        await db_session.execute(text("SELECT 1"))
+    round_trips = uow.round_trips
+
+    await db_session.execute(text("SELECT 1"))
+    await db_session.commit()
+
+    assert uow.round_trips == round_trips
+
+
+@pytest.fixture
+def session_recorder(app):
+    """Wraps the session dependency to record sessions and how many
+    transactions (i.e. connection checkouts) each one began."""
+    from sqlalchemy import event
+
+    from app.api.deps import db_session_dep
+
+    original = app.dependency_overrides[db_session_dep]
+    sessions = []
+
+    async def recording_session():
+        async for session in original():
+            record = {"session": session, "begins": 0}
+
+            def after_begin(*_):
+                record["begins"] += 1
+
+            event.listen(session.sync_session, "after_begin", after_begin)
+            sessions.append(record)
+            yield session
+
+    app.dependency_overrides[db_session_dep] = recording_session
+    yield sessions
+    app.dependency_overrides[db_session_dep] = original
+
+
+@pytest.mark.asyncio
+async def test_admin_request_shares_one_session(
+    client, admin_auth_header, session_recorder
+):
+    response = await client.get("/api/v1/admin/users", headers=admin_auth_header)
+
+    assert response.status_code == 200
+    assert len(session_recorder) == 1
+
+
+@pytest.mark.asyncio
+async def test_session_without_statements_never_checks_out(
+    client, session_recorder, service_header
+):
+    response = await client.post(
+        "/api/v1/auth/introspect",
+        json={"tokens": ["not-a-jwt"]},
+        headers=service_header,
+    )
+
+    assert response.status_code == 200
+    assert [record["begins"] for record in session_recorder] == [0]
@@ -0,0 +1,119 @@
+import pytest
+
+from app.core.invalidation import (
+    InMemoryTransport,
+    InvalidationBus,
+    InvalidationEvent,
+    encode_events,
+    invalidation_bus,
+)
+from app.repositories.user_repository import UserRepository
+
+
+def test_events_reach_other_workers_once():
+    transport = InMemoryTransport()
+    worker_a = InvalidationBus(transport)
+    worker_b = InvalidationBus(transport)
+    received = []
+    worker_b.subscribe("user", received.append)
+
+    e = InvalidationEvent("user", "01ABC", 1)
+    transport.committed(worker_a, [e])
+    worker_b.receive(encode_events([e]))
+
+    assert received == [e]
+    assert worker_b.duplicates == 1
+
+
+def test_resync_flushes_subscribers():
+    bus = InvalidationBus(InMemoryTransport())
+    flushed = []
+    bus.subscribe("user", lambda e: None, resync=lambda: flushed.append(True))
+
+    bus.resync()
+
+    assert flushed == [True]
+
+
+@pytest.mark.asyncio
+async def test_user_update_notifies_other_workers_on_commit(db_session, create_user):
+    _, data = await create_user()
+    other_worker = InvalidationBus(invalidation_bus.transport)
+    received = []
+    other_worker.subscribe("user", received.append)
+
+    repo = UserRepository(db_session)
+    user = await repo.get_by_id(data["id"])
+    user.is_active = False
+    await repo.update(user)
+    await db_session.rollback()
+    assert received == []
+
+    user = await repo.get_by_id(data["id"])
+    user.is_active = False
+    await repo.update(user)
+    await db_session.commit()
+
+    assert [e.key for e in received] == [data["id"]]
+
+
+class _FakeListenConnection:
+    """Stands in for an asyncpg connection whose failures are scripted."""
+
+    def __init__(self, fail_listen: bool = False, fail_probe: bool = False):
+        self.fail_listen = fail_listen
+        self.fail_probe = fail_probe
+        self.terminated = False
+
+    def add_termination_listener(self, callback):
+        pass
+
+    async def add_listener(self, channel, callback):
+        if self.fail_listen:
+            raise RuntimeError("listener setup failed")
+
+    async def execute(self, query, timeout=None):
+        if self.fail_probe:
+            raise TimeoutError("half-open connection")
+
+    def terminate(self):
+        self.terminated = True
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_after_any_failure(monkeypatch):
+    import asyncio
+
+    import asyncpg
+
+    from app.core.invalidation import PostgresNotifyTransport
+
+    connections = [
+        _FakeListenConnection(fail_listen=True),
+        _FakeListenConnection(fail_probe=True),
+        _FakeListenConnection(),
+    ]
+    pending = iter(connections)
+
+    async def connect(dsn, timeout=None):
+        return next(pending)
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    transport = PostgresNotifyTransport(
+        "postgresql://test", "test", reconnect_seconds=0, probe_seconds=0.01
+    )
+    bus = InvalidationBus(transport)
+
+    listener = asyncio.create_task(transport.listen(bus))
+    while bus.resyncs < 2 or not transport.connected:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)  # the last connection passes its probes
+    assert transport.connected is True
+
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
+
+    assert transport.connected is False
+    assert bus.resyncs == 2
+    assert all(conn.terminated for conn in connections)
@@ -0,0 +1,70 @@
+import ecdsa
+import pytest
+from jose.exceptions import JWTError
+
+from app.core.config import get_settings
+from app.core.keys import KeyRing
+
+
+def write_ec_key(path):
+    key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+    path.write_bytes(key.to_pem())
+    return path
+
+
+@pytest.fixture
+def key_files(tmp_path):
+    old_private = write_ec_key(tmp_path / "old.pem")
+    new_private = write_ec_key(tmp_path / "new.pem")
+    old_public = tmp_path / "old.pub.pem"
+    old_public.write_bytes(
+        ecdsa.SigningKey.from_pem(old_private.read_bytes()).verifying_key.to_pem()
+    )
+    return old_private, new_private, old_public
+
+
+def key_ring(private_key, kid, retired=""):
+    settings = get_settings().model_copy(
+        update={
+            "jwt_algorithm": "ES256",
+            "jwt_private_key_file": str(private_key),
+            "jwt_key_id": kid,
+            "jwt_retired_public_key_files": retired,
+        }
+    )
+    return KeyRing.from_settings(settings)
+
+
+def test_rotated_key_ring_still_verifies_old_tokens(key_files):
+    old_private, new_private, old_public = key_files
+
+    old_ring = key_ring(old_private, "k1")
+    token = old_ring.sign({"sub": "user-1"})
+
+    new_ring = key_ring(new_private, "k2", retired=f"k1={old_public}")
+    assert new_ring.verify(token)["sub"] == "user-1"
+    assert new_ring.verify(new_ring.sign({"sub": "user-2"}))["sub"] == "user-2"
+    assert {key["kid"] for key in new_ring.jwks()["keys"]} == {"k1", "k2"}
+
+    # once the old key is dropped its tokens are rejected
+    with pytest.raises(JWTError):
+        key_ring(new_private, "k2").verify(token)
+
+
+def test_hmac_algorithms_have_no_key_ring():
+    assert KeyRing.from_settings(get_settings()) is None
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint_is_cacheable(client):
+    response = await client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "keys" in response.json()
+    assert "max-age" in response.headers["Cache-Control"]
+
+    cached = await client.get(
+        "/.well-known/jwks.json",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert cached.status_code == 304
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from app.core.jwt_codec import HMACJWTCodec
+
+SECRET = "test-secret"
+
+
+def claims(exp_offset: int = 900) -> dict:
+    now = int(time.time())
+    return {
+        "sub": "user-1",
+        "type": "access",
+        "iat": now,
+        "exp": now + exp_offset,
+        "jti": "8d3c6f0e-6a57-4a53-9a4d-5a3f9d0f1b2c",
+    }
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_encode_is_byte_identical_to_jose(algorithm):
+    payload = claims()
+    codec = HMACJWTCodec(SECRET, algorithm)
+
+    assert codec.encode(payload) == jwt.encode(dict(payload), SECRET, algorithm=algorithm)
+
+
+def test_decode_roundtrip():
+    codec = HMACJWTCodec(SECRET, "HS256")
+    payload = claims()
+
+    assert codec.decode(codec.encode(payload)) == payload
+
+
+def test_decode_rejects_expired_and_tampered_tokens():
+    codec = HMACJWTCodec(SECRET, "HS256")
+
+    with pytest.raises(ExpiredSignatureError):
+        codec.decode(codec.encode(claims(exp_offset=-10)))
+
+    header, payload, signature = codec.encode(claims()).split(".")
+    with pytest.raises(JWTError):
+        codec.decode(f"{header}.{payload}.{signature[::-1]}")
+
+    other = HMACJWTCodec("other-secret", "HS256")
+    with pytest.raises(JWTError):
+        codec.decode(other.encode(claims()))
+
+
+def test_unusual_tokens_fall_back_to_jose():
+    codec = HMACJWTCodec(SECRET, "HS256")
+    payload = dict(claims(), aud="someone-else")
+
+    # extra header and extra claim: jose decides, and rejects the audience
+    token = jwt.encode(payload, SECRET, algorithm="HS256", headers={"kid": "k1"})
+    with pytest.raises(JWTError):
+        codec.decode(token)
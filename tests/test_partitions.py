@@ -0,0 +1,147 @@
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.db.partitions import (
+    PartitionMaintainer,
+    PartitionSpec,
+    create_partitions,
+    slices_ahead,
+)
+
+
+def test_partition_bounds_and_names():
+    spec = PartitionSpec("refresh_tokens", interval_days=7)
+
+    start, end = spec.bounds(datetime(2026, 10, 18, 13, 5))
+
+    assert start <= datetime(2026, 10, 18, tzinfo=timezone.utc) < end
+    assert end - start == timedelta(days=7)
+    assert spec.bounds(end) == (end, end + timedelta(days=7))
+
+    name = spec.name(start, end)
+    assert name == "refresh_tokens_p20261015_20261022"
+    assert spec.parse_end(name) == end
+    assert spec.parse_end("refresh_tokens_old") is None
+
+
+def test_enough_partitions_are_made_for_the_refresh_lifetime():
+    from app.core.config import get_settings
+
+    settings = get_settings().model_copy(
+        update={
+            "REFRESH_TOKEN_EXPIRE_SECONDS": 30 * 86_400,
+            "token_partition_interval_days": 7,
+            "token_partition_premake": 2,
+        }
+    )
+
+    assert slices_ahead(settings) == 6
+
+
+@pytest.mark.asyncio
+async def test_maintenance_is_a_no_op_off_postgres(db_session):
+    maintainer = PartitionMaintainer(
+        [PartitionSpec("refresh_tokens", 7)], ahead=4, retention=timedelta(days=1)
+    )
+
+    result = await maintainer.run(db_session.bind)
+
+    assert result == {"created": [], "dropped": []}
+
+
+class _RecordingConnection:
+    def __init__(self, partitions: dict[str, bool], statements: list[str]):
+        self.partitions = partitions
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run_sync(self, fn, *args):
+        return self.partitions
+
+    async def execution_options(self, **options):
+        return self
+
+    async def execute(self, statement):
+        self.statements.append(str(statement))
+
+
+class _RecordingEngine:
+    def __init__(self, partitions: dict[str, bool]):
+        self.partitions = partitions
+        self.statements: list[str] = []
+
+    def connect(self):
+        return _RecordingConnection(self.partitions, self.statements)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_detach_is_finalized_before_drop():
+    spec = PartitionSpec("refresh_tokens", 7)
+    maintainer = PartitionMaintainer([spec], ahead=4, retention=timedelta(days=1))
+    engine = _RecordingEngine(
+        {
+            "refresh_tokens_p20200101_20200108": True,
+            "refresh_tokens_p20200108_20200115": False,
+        }
+    )
+
+    dropped = await maintainer._drop_expired(engine, spec)
+
+    assert dropped == list(engine.partitions)
+    ddl = [s for s in engine.statements if "DETACH" in s or "DROP" in s]
+    assert ddl == [
+        'ALTER TABLE "refresh_tokens" '
+        'DETACH PARTITION "refresh_tokens_p20200101_20200108" FINALIZE',
+        'DROP TABLE "refresh_tokens_p20200101_20200108"',
+        'ALTER TABLE "refresh_tokens" '
+        'DETACH PARTITION "refresh_tokens_p20200108_20200115" CONCURRENTLY',
+        'DROP TABLE "refresh_tokens_p20200108_20200115"',
+    ]
+
+
+class _SyncRecordingConnection:
+    def __init__(self, fail_on: str | None = None):
+        self.statements: list[str] = []
+        self.fail_on = fail_on
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if self.fail_on and self.fail_on in sql:
+            orig = Exception("canceling statement due to lock timeout")
+            orig.pgcode = "55P03"
+            raise DBAPIError(sql, params, orig)
+        self.statements.append(sql)
+        return MagicMock(all=lambda: [])
+
+    def begin_nested(self):
+        return nullcontext()
+
+
+def test_new_slices_are_attached_rather_than_created_as_partitions():
+    spec = PartitionSpec("refresh_tokens", 7)
+    conn = _SyncRecordingConnection()
+
+    created = create_partitions(conn, spec, datetime.now(timezone.utc), ahead=1)
+
+    assert len(created) == 2
+    ddl = conn.statements[1:]
+    assert not any("PARTITION OF" in s for s in ddl)
+    assert ddl[0] == f'CREATE TABLE "{created[0]}" (LIKE "refresh_tokens" INCLUDING ALL)'
+    assert "CHECK" in ddl[1]
+    assert ddl[2].startswith(f'ALTER TABLE "refresh_tokens" ATTACH PARTITION "{created[0]}"')
+
+
+def test_slices_left_for_next_run_when_lock_times_out():
+    spec = PartitionSpec("refresh_tokens", 7)
+    conn = _SyncRecordingConnection(fail_on="ATTACH PARTITION")
+
+    assert create_partitions(conn, spec, datetime.now(timezone.utc), ahead=1) == []
@@ -0,0 +1,45 @@
+import uuid
+
+import pytest
+
+from app.core.rate_limit import (
+    InMemoryRateLimitStorage,
+    RateLimiter,
+    RateLimitExceeded,
+    SharedMemoryRateLimitStorage,
+)
+
+
+def test_token_bucket_rejects_after_burst_and_refills():
+    storage = InMemoryRateLimitStorage()
+
+    assert storage.consume("k", rate=1.0, burst=2, now=100.0) == 0
+    assert storage.consume("k", rate=1.0, burst=2, now=100.0) == 0
+    assert storage.consume("k", rate=1.0, burst=2, now=100.0) == pytest.approx(1.0)
+
+    # one second later one token is back
+    assert storage.consume("k", rate=1.0, burst=2, now=101.0) == 0
+
+
+def test_rate_limiter_raises_with_retry_after():
+    limiter = RateLimiter(InMemoryRateLimitStorage(), "test", per_minute=1, burst=1)
+
+    limiter.hit("a")
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.hit("a")
+
+    assert exc.value.retry_after == 60
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_shared_memory_storage_is_shared_between_handles():
+    name = f"test_rl_{uuid.uuid4().hex[:8]}"
+    first = SharedMemoryRateLimitStorage(name, slots=64)
+    second = SharedMemoryRateLimitStorage(name, slots=64)
+    try:
+        assert first.consume("k", rate=1.0, burst=1, now=100.0) == 0
+        assert second.consume("k", rate=1.0, burst=1, now=100.0) > 0
+    finally:
+        second.close()
+        first.close()
+        first.unlink()
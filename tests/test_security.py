@@ -0,0 +1,101 @@
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.security import (
+    settings,
+    TokenPayloadError,
+    create_access_token,
+    decode_token,
+    token_cache_stats,
+    PasswordHashingOverloaded,
+    hash_password_async,
+    verify_password_async,
+    hash_executor_stats,
+    calibrate_argon2,
+    pwd_context,
+    password_needs_rehash,
+    _argon2_params,
+)
+
+
+@pytest.mark.asyncio
+async def test_async_hash_and_verify_roundtrip():
+    hashed = await hash_password_async("strongpassword123")
+
+    assert await verify_password_async("strongpassword123", hashed) is True
+    assert await verify_password_async("wrongpassword123", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_hash_executor_stats_reports_idle_pool():
+    await hash_password_async("strongpassword123")
+
+    stats = hash_executor_stats()
+    assert stats["executor"] in ("process", "thread")
+    assert stats["workers"] >= 1
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_sheds_load_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(settings, "password_hash_max_pending", 0)
+
+    with pytest.raises(PasswordHashingOverloaded) as exc:
+        await hash_password_async("strongpassword123")
+
+    assert exc.value.retry_after >= 1
+    assert hash_executor_stats()["shed_total"] >= 1
+
+
+def test_calibrate_argon2_returns_usable_parameters():
+    params = calibrate_argon2(target_ms=0, memory_cost=1024, parallelism=1)
+
+    assert params == {"memory_cost": 1024, "parallelism": 1, "time_cost": 1}
+
+
+def test_only_hashes_cheaper_than_configured_need_rehash():
+    argon2 = pwd_context.handler("argon2").using(
+        memory_cost=_argon2_params["memory_cost"],
+        parallelism=_argon2_params["parallelism"],
+    )
+    time_cost = _argon2_params["time_cost"]
+
+    assert password_needs_rehash(argon2.using(time_cost=time_cost - 1).hash("pw"))
+    assert not password_needs_rehash(argon2.using(time_cost=time_cost).hash("pw"))
+    assert not password_needs_rehash(argon2.using(time_cost=time_cost + 1).hash("pw"))
+
+
+def test_decode_token_serves_repeat_lookups_from_cache():
+    token = create_access_token("user-1")
+    before = token_cache_stats()
+
+    assert decode_token(token, expected_type="access") == "user-1"
+    assert decode_token(token, expected_type="access") == "user-1"
+
+    after = token_cache_stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_cached_token_still_enforces_type():
+    token = create_access_token("user-1")
+    decode_token(token, expected_type="access")
+
+    with pytest.raises(TokenPayloadError):
+        decode_token(token, expected_type="refresh")
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [100.0]
+    cache = TTLCache(maxsize=2, clock=lambda: now[0])
+
+    cache.set("a", 1, expires_at=150.0)
+    cache.set("b", 2, expires_at=500.0)
+    cache.set("c", 3, expires_at=500.0)  # evicts "a", the least recently used
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 600.0
+    assert cache.get("b") is None
+    assert cache.stats()["expirations"] == 1
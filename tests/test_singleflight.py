@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_lookup():
+    flight = SingleFlight("test_shared")
+    lookups = 0
+
+    async def lookup():
+        nonlocal lookups
+        lookups += 1
+        await asyncio.sleep(0.01)
+        return "row"
+
+    results = await asyncio.gather(*(flight.do("key", lookup) for _ in range(10)))
+
+    assert results == ["row"] * 10
+    assert lookups == 1
+    assert flight.stats() == {"calls": 10, "coalesced": 9, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiting_caller():
+    flight = SingleFlight("test_errors")
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        raise LookupError("boom")
+
+    results = await asyncio.gather(
+        *(flight.do("key", lookup) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, LookupError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight("test_cancel")
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "row"
+
+    leader = asyncio.create_task(flight.do("key", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("key", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "row"
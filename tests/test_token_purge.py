@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.password_reset_token import PasswordResetToken
+from app.models.refresh_token import RefreshToken
+from app.services.token_purge import TokenPurger
+
+
+def _token(model, user_id, expires_in, **flags):
+    return model(
+        id=str(uuid4()),
+        user_id=user_id,
+        token_digest=os.urandom(32),
+        expires_at=datetime.utcnow() + timedelta(seconds=expires_in),
+        **flags,
+    )
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_dead_tokens_in_batches(db_session, create_user):
+    _, user = await create_user()
+    live = _token(RefreshToken, user["id"], 3600)
+    db_session.add_all(
+        [live]
+        + [_token(RefreshToken, user["id"], -60) for _ in range(3)]
+        + [_token(RefreshToken, user["id"], 3600, is_revoked=True)]
+        + [_token(PasswordResetToken, user["id"], 3600, used=True)]
+    )
+    await db_session.commit()
+
+    purger = TokenPurger(
+        async_sessionmaker(bind=db_session.bind, expire_on_commit=False),
+        batch_size=2,
+        pause_seconds=0,
+        grace_seconds=0,
+    )
+    results = {r.table: r for r in await purger.run()}
+
+    assert results["refresh_tokens"].deleted >= 4
+    assert results["refresh_tokens"].batches >= 2
+    assert results["password_reset_tokens"].deleted >= 1
+    assert purger.stats()["runs"] == 1
+
+    remaining = await db_session.scalars(
+        select(RefreshToken.id).where(RefreshToken.user_id == user["id"])
+    )
+    assert remaining.all() == [live.id]
+
+
+@pytest.mark.asyncio
+async def test_purge_keeps_tokens_within_grace_period(db_session, create_user):
+    _, user = await create_user()
+    recent = _token(RefreshToken, user["id"], -60)
+    db_session.add(recent)
+    await db_session.commit()
+
+    purger = TokenPurger(
+        async_sessionmaker(bind=db_session.bind, expire_on_commit=False),
+        pause_seconds=0,
+        grace_seconds=3600,
+    )
+    await purger.run()
+
+    remaining = await db_session.scalars(
+        select(RefreshToken.id).where(RefreshToken.id == recent.id)
+    )
+    assert remaining.all() == [recent.id]
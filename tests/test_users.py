@@ -36,3 +36,138 @@ async def test_get_current_user_me(client, auth_header):
 async def test_get_me_without_token_fails(client):
     response = await client.get("/api/v1/users/me")
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_registration_returns_503_when_hashing_is_overloaded(
+    client, monkeypatch
+):
+    from app.core.security import settings
+    from conftest import user_payload
+
+    monkeypatch.setattr(settings, "password_hash_max_pending", 0)
+
+    response = await client.post("/api/v1/users", json=user_payload())
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    assert response.json()["error"]["code"] == "SERVICE_UNAVAILABLE"
+
+
+@pytest.mark.asyncio
+async def test_update_me_changes_username(client, auth_header):
+    from conftest import user_payload
+
+    new_username = user_payload()["username"]
+
+    response = await client.patch(
+        "/api/v1/users/me",
+        json={"username": new_username},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["username"] == new_username
+    assert data["updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_get_me_is_served_from_user_cache(client, auth_header):
+    from app.repositories.user_cache import user_cache
+
+    await client.get("/api/v1/users/me", headers=auth_header)
+    hits = user_cache.hits
+
+    response = await client.get("/api/v1/users/me", headers=auth_header)
+
+    assert response.status_code == 200
+    assert user_cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_load_overlapping_a_write_does_not_recache_old_row(
+    create_user, db_session, monkeypatch
+):
+    import asyncio
+
+    from conftest import TestSessionLocal
+
+    from app.models.user import User
+    from app.repositories.user_cache import user_cache
+    from app.repositories.user_repository import UserRepository
+
+    _, data = await create_user()
+    user_cache.pop(data["id"])
+
+    # hold the read open after it has seen the active row
+    read_done, release = asyncio.Event(), asyncio.Event()
+    get_by_id = UserRepository.get_by_id
+
+    async def slow_get_by_id(self, user_id):
+        user = await get_by_id(self, user_id)
+        read_done.set()
+        await release.wait()
+        return user
+
+    monkeypatch.setattr(UserRepository, "get_by_id", slow_get_by_id)
+    reader = asyncio.create_task(UserRepository(db_session).get_snapshot(data["id"]))
+    await read_done.wait()
+
+    async with TestSessionLocal() as session:
+        user = await session.get(User, data["id"])
+        user.is_active = False
+        await UserRepository(session).update(user)
+        await session.commit()
+
+    release.set()
+    assert (await reader).is_active is True
+    assert user_cache.get(data["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_update_me_invalidates_cached_user(client, auth_header):
+    from conftest import user_payload
+
+    await client.get("/api/v1/users/me", headers=auth_header)
+    new_username = user_payload()["username"]
+
+    await client.patch(
+        "/api/v1/users/me",
+        json={"username": new_username},
+        headers=auth_header,
+    )
+    response = await client.get("/api/v1/users/me", headers=auth_header)
+
+    assert response.json()["data"]["username"] == new_username
+
+
+@pytest.mark.asyncio
+async def test_registration_rejects_duplicate_email_and_username(client, create_user):
+    from conftest import user_payload
+
+    payload, _ = await create_user()
+
+    same_email = {**user_payload(), "email": payload["email"]}
+    response = await client.post("/api/v1/users", json=same_email)
+    assert response.status_code == 400
+    assert response.json()["error"]["message"] == "Email already registered"
+
+    same_username = {**user_payload(), "username": payload["username"]}
+    response = await client.post("/api/v1/users", json=same_username)
+    assert response.status_code == 400
+    assert response.json()["error"]["message"] == "Username already taken"
+
+
+@pytest.mark.asyncio
+async def test_update_me_rejects_taken_username(client, auth_header, create_user):
+    payload, _ = await create_user()
+
+    response = await client.patch(
+        "/api/v1/users/me",
+        json={"username": payload["username"]},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["message"] == "Username already taken"